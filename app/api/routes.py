@@ -3,30 +3,37 @@ FastAPI REST API routes for SupportIQ.
 Provides endpoints for ticket management, search, and analytics.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text, update
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import select, insert, func, text, update, cast, Integer, Float, String
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import Any, List, Mapping, Optional, Tuple
 
-from app.database.connection import get_async_session
+from app.config import get_settings
+from app.database.connection import get_async_session, get_async_context_session
 from app.models.ticket import Ticket, TicketEmbedding, Resolution, TicketStatus, KnowledgeTier, UrgencyLevel
-from app.models.knowledge import KnowledgeBase
 from app.services import (
     SemanticSearchService, semantic_search_service,
     SentimentAnalyzer, sentiment_analyzer,
     UrgencyCalculator, urgency_calculator,
     KnowledgeBaseService, knowledge_base_service,
-    AutoPromotionService, auto_promotion_service
+    AutoPromotionService, auto_promotion_service,
+    sentiment_batcher, embedding_batcher,
+    search_cache, sentiment_cache, kb_vector_index
 )
 from app.api.schemas import (
     TicketCreate, TicketResolve, SearchQuery, KnowledgeCreate, PromoteRequest,
-    TicketResponse, TicketCreateResponse, SearchResponse, SearchResult,
+    TicketResponse, TicketCreateResponse, SearchResponse, SEARCH_RESULT_LIST,
     KnowledgeResponse, PromotionResponse, PromotionCandidates, AnalyticsResponse,
     HealthResponse, UrgencyAnalysis, SentimentAnalysis
 )
 from app import __version__
 
+settings = get_settings()
+
 router = APIRouter()
 
 
@@ -37,22 +44,60 @@ async def health_check():
     """Check system health and model status."""
     return HealthResponse(
         status="healthy",
+        ready=semantic_search_service._initialized and sentiment_analyzer._initialized,
         database="connected",
         models_loaded={
             "minilm_semantic": semantic_search_service._initialized,
             "bert_sentiment": sentiment_analyzer._initialized
         },
+        search_cache=search_cache.stats(),
+        sentiment_cache=sentiment_cache.stats(),
         version=__version__
     )
 
 
+async def wait_for_models(request: Request) -> None:
+    """Dependency that holds ML endpoints until background model preload ends."""
+    task = getattr(request.app.state, "model_task", None)
+    if task is None or task.done():
+        return
+    # A failed preload logs and returns; the services then load lazily on first use
+    await asyncio.shield(task)
+
+
+async def _analyze_ticket_text(combined_text: str) -> Tuple[Mapping[str, Any], np.ndarray]:
+    """
+    Run sentiment analysis and embedding for a new ticket.
+    
+    With SENTIMENT_CACHE_ENABLED, the text is embedded first and a
+    near-duplicate recent ticket's sentiment is reused instead of running
+    BERT; otherwise both model calls run concurrently.
+    
+    Args:
+        combined_text: Ticket title and description
+        
+    Returns:
+        Tuple of (sentiment analysis result, MiniLM embedding)
+    """
+    if not settings.sentiment_cache_enabled:
+        sentiment, embedding = await asyncio.gather(
+            sentiment_batcher.submit(combined_text),
+            embedding_batcher.submit(combined_text)
+        )
+        return sentiment, embedding
+    
+    embedding = await embedding_batcher.submit(combined_text)
+    sentiment = sentiment_cache.lookup(embedding)
+    if sentiment is None:
+        sentiment = await sentiment_batcher.submit(combined_text)
+        sentiment_cache.store(embedding, sentiment)
+    return sentiment, embedding
+
+
 # ============== Ticket Endpoints ==============
 
-@router.post("/tickets", response_model=TicketCreateResponse, tags=["Tickets"])
-async def create_ticket(
-    ticket_data: TicketCreate,
-    session: AsyncSession = Depends(get_async_session)
-):
+@router.post("/tickets", response_model=TicketCreateResponse, tags=["Tickets"], dependencies=[Depends(wait_for_models)])
+async def create_ticket(ticket_data: TicketCreate):
     """
     Create a new support ticket with automatic analysis.
     
@@ -61,79 +106,72 @@ async def create_ticket(
     - Dynamic urgency scoring (1-10)
     - Tier assignment based on urgency
     - Semantic search for suggested solutions
+    
+    Model inference runs before a database session is opened, so a pooled
+    connection is only held for the inserts and the knowledge base search.
     """
     # Combine title and description for analysis
     combined_text = f"{ticket_data.title} {ticket_data.description}"
     
-    # Sentiment Analysis
-    sentiment_result = sentiment_analyzer.analyze(combined_text)
+    # Model calls are batched with concurrent requests
+    sentiment_result, embedding = await _analyze_ticket_text(combined_text)
     
-    # Urgency Calculation
+    # Urgency reuses the sentiment result, leaving only cheap text checks
     urgency_result = urgency_calculator.calculate(
         title=ticket_data.title,
         description=ticket_data.description,
         category=ticket_data.category,
-        user_tier=ticket_data.user_tier
-    )
-    
-    # Create ticket record
-    ticket = Ticket(
-        title=ticket_data.title,
-        description=ticket_data.description,
-        user_email=ticket_data.user_email,
-        category=ticket_data.category or urgency_result.factors.get("detected_category"),
-        urgency_score=urgency_result.score,
-        urgency_level=urgency_result.level,
-        sentiment_score=sentiment_result["score"],
-        sentiment_label=sentiment_result["label"],
-        assigned_tier=urgency_result.tier,
-        status=TicketStatus.OPEN
-    )
-    
-    session.add(ticket)
-    await session.flush()
-    
-    # Generate and store embedding
-    embedding = semantic_search_service.encode(combined_text)
-    ticket_embedding = TicketEmbedding(
-        ticket_id=ticket.id,
-        embedding=embedding.tolist()
-    )
-    session.add(ticket_embedding)
-    
-    # Search for suggested solutions
-    search_results = await knowledge_base_service.search_tiered(
-        session=session,
-        query=combined_text,
-        start_tier=urgency_result.tier,
-        cascade=True
+        user_tier=ticket_data.user_tier,
+        sentiment_result=sentiment_result
     )
     
-    await session.commit()
-    await session.refresh(ticket)
+    async with get_async_context_session() as session:
+        # Insert the ticket and read back server defaults in one statement
+        result = await session.execute(
+            insert(Ticket)
+            .values(
+                title=ticket_data.title,
+                description=ticket_data.description,
+                user_email=ticket_data.user_email,
+                category=ticket_data.category,
+                urgency_score=urgency_result.score,
+                urgency_level=urgency_result.level,
+                sentiment_score=sentiment_result["score"],
+                sentiment_label=sentiment_result["label"],
+                assigned_tier=urgency_result.tier,
+                status=TicketStatus.OPEN
+            )
+            .returning(Ticket)
+        )
+        ticket = result.scalar_one()
+        
+        # Store embedding
+        await session.execute(
+            insert(TicketEmbedding).values(ticket_id=ticket.id, embedding=embedding)
+        )
+        
+        # Search for suggested solutions, reusing results for similar past tickets
+        cache_namespace = ("tiered", urgency_result.tier.value)
+        search_results = search_cache.lookup(embedding, namespace=cache_namespace)
+        if search_results is None:
+            search_results = await knowledge_base_service.search_tiered(
+                session=session,
+                query=combined_text,
+                start_tier=urgency_result.tier,
+                cascade=True,
+                query_embedding=embedding
+            )
+            search_cache.store(embedding, search_results, namespace=cache_namespace)
+        
+        await session.commit()
     
     return TicketCreateResponse(
-        ticket=TicketResponse(
-            id=ticket.id,
-            title=ticket.title,
-            description=ticket.description,
-            status=ticket.status,
-            urgency_score=ticket.urgency_score,
-            urgency_level=ticket.urgency_level,
-            sentiment_score=ticket.sentiment_score,
-            sentiment_label=ticket.sentiment_label,
-            category=ticket.category,
-            assigned_tier=ticket.assigned_tier,
-            user_email=ticket.user_email,
-            created_at=ticket.created_at,
-            updated_at=ticket.updated_at,
-            resolved_at=ticket.resolved_at
-        ),
+        ticket=TicketResponse.model_validate(ticket),
         urgency_analysis=UrgencyAnalysis(
             score=urgency_result.score,
             level=urgency_result.level,
             assigned_tier=urgency_result.tier,
-            factors=urgency_result.factors,
+            factors=urgency_result.factors._asdict(),
             explanation=urgency_result.explanation
         ),
         sentiment_analysis=SentimentAnalysis(
@@ -160,22 +198,7 @@ async def get_ticket(
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
-    return TicketResponse(
-        id=ticket.id,
-        title=ticket.title,
-        description=ticket.description,
-        status=ticket.status,
-        urgency_score=ticket.urgency_score,
-        urgency_level=ticket.urgency_level,
-        sentiment_score=ticket.sentiment_score,
-        sentiment_label=ticket.sentiment_label,
-        category=ticket.category,
-        assigned_tier=ticket.assigned_tier,
-        user_email=ticket.user_email,
-        created_at=ticket.created_at,
-        updated_at=ticket.updated_at,
-        resolved_at=ticket.resolved_at
-    )
+    return TicketResponse.model_validate(ticket)
 
 
 @router.get("/tickets", tags=["Tickets"])
@@ -188,7 +211,19 @@ async def list_tickets(
     session: AsyncSession = Depends(get_async_session)
 ):
     """List tickets with optional filters."""
-    query = select(Ticket)
+    # Fetch only the listed columns, pre-formatted by Postgres, so no ORM
+    # objects are built for the page
+    query = select(
+        Ticket.id,
+        Ticket.title,
+        cast(Ticket.status, String).label("status"),
+        Ticket.urgency_score,
+        cast(Ticket.urgency_level, String).label("urgency_level"),
+        cast(Ticket.assigned_tier, String).label("assigned_tier"),
+        func.to_char(
+            Ticket.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.USTZH:TZM'
+        ).label("created_at")
+    )
     
     if status:
         query = query.where(Ticket.status == status)
@@ -197,27 +232,17 @@ async def list_tickets(
     if tier:
         query = query.where(Ticket.assigned_tier == tier)
     
+    # Served by idx_tickets_status_urgency_created without a sort node
     query = query.order_by(Ticket.urgency_score.desc(), Ticket.created_at.desc())
     query = query.limit(limit).offset(offset)
     
     result = await session.execute(query)
-    tickets = result.scalars().all()
-    
-    return {
-        "tickets": [
-            {
-                "id": t.id,
-                "title": t.title,
-                "status": t.status.value if t.status else None,
-                "urgency_score": t.urgency_score,
-                "urgency_level": t.urgency_level.value if t.urgency_level else None,
-                "assigned_tier": t.assigned_tier.value if t.assigned_tier else None,
-                "created_at": t.created_at.isoformat() if t.created_at else None
-            }
-            for t in tickets
-        ],
+    tickets = [dict(row) for row in result.mappings()]
+    
+    return ORJSONResponse(content={
+        "tickets": tickets,
         "count": len(tickets)
-    }
+    })
 
 
 @router.post("/tickets/{ticket_id}/resolve", tags=["Tickets"])
@@ -230,19 +255,27 @@ async def resolve_ticket(
     Mark a ticket as resolved and record resolution details.
     Also triggers knowledge base usage tracking and auto-promotion check.
     """
+    # Mark resolved and compute resolution time in a single statement
     result = await session.execute(
-        select(Ticket).where(Ticket.id == ticket_id)
+        update(Ticket)
+        .where(Ticket.id == ticket_id)
+        .values(
+            status=TicketStatus.RESOLVED,
+            resolved_at=func.now()
+        )
+        .returning(
+            cast(
+                func.floor(func.extract("epoch", func.now() - Ticket.created_at) / 60),
+                Integer
+            ).label("resolution_time_minutes")
+        )
     )
-    ticket = result.scalar_one_or_none()
+    row = result.first()
     
-    if not ticket:
+    if row is None:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
-    # Calculate resolution time
-    resolution_time = None
-    if ticket.created_at:
-        delta = datetime.now(ticket.created_at.tzinfo) - ticket.created_at
-        resolution_time = int(delta.total_seconds() / 60)
+    resolution_time = row.resolution_time_minutes
     
     # Create resolution record
     res = Resolution(
@@ -256,16 +289,6 @@ async def resolve_ticket(
     )
     session.add(res)
     
-    # Update ticket status
-    await session.execute(
-        update(Ticket)
-        .where(Ticket.id == ticket_id)
-        .values(
-            status=TicketStatus.RESOLVED,
-            resolved_at=datetime.utcnow()
-        )
-    )
-    
     # Record knowledge base usage if applicable
     if resolution.knowledge_id:
         await knowledge_base_service.record_usage(
@@ -279,18 +302,22 @@ async def resolve_ticket(
     
     # Check for auto-promotions
     promotions = await auto_promotion_service.check_and_promote(session)
+    if promotions:
+        await session.commit()
+        search_cache.clear()
+        kb_vector_index.invalidate()
     
-    return {
+    return ORJSONResponse(content={
         "message": "Ticket resolved successfully",
         "ticket_id": ticket_id,
         "resolution_time_minutes": resolution_time,
         "auto_promotions": promotions
-    }
+    })
 
 
 # ============== Search Endpoints ==============
 
-@router.post("/search", response_model=SearchResponse, tags=["Search"])
+@router.post("/search", response_model=SearchResponse, tags=["Search"], dependencies=[Depends(wait_for_models)])
 async def search_knowledge_base(
     query: SearchQuery,
     session: AsyncSession = Depends(get_async_session)
@@ -303,34 +330,44 @@ async def search_knowledge_base(
     if query.tier:
         tier = KnowledgeTier(query.tier.value)
     
+    # Paraphrased queries are served from the semantic cache
+    query_embedding = await embedding_batcher.submit(query.query)
     if query.cascade:
-        results = await knowledge_base_service.search_tiered(
-            session=session,
-            query=query.query,
-            start_tier=tier or KnowledgeTier.L1,
-            cascade=True
-        )
+        cache_namespace = ("tiered", (tier or KnowledgeTier.L1).value)
     else:
-        results = await semantic_search_service.hybrid_search(
-            session=session,
-            query=query.query,
-            tier=tier,
-            top_k=query.top_k
-        )
-        results = {
-            "results": results,
-            "searched_tiers": [tier.value] if tier else ["L1", "L2", "L3"],
-            "total_found": len(results),
-            "query": query.query
-        }
+        cache_namespace = ("hybrid", tier.value if tier else None, query.top_k)
+    
+    results = search_cache.lookup(query_embedding, namespace=cache_namespace)
+    if results is None:
+        if query.cascade:
+            results = await knowledge_base_service.search_tiered(
+                session=session,
+                query=query.query,
+                start_tier=tier or KnowledgeTier.L1,
+                cascade=True,
+                query_embedding=query_embedding
+            )
+        else:
+            results = await semantic_search_service.hybrid_search(
+                session=session,
+                query=query.query,
+                tier=tier,
+                top_k=query.top_k,
+                query_embedding=query_embedding
+            )
+            results = {
+                "results": results,
+                "searched_tiers": [tier.value] if tier else ["L1", "L2", "L3"],
+                "total_found": len(results),
+                "query": query.query
+            }
+        search_cache.store(query_embedding, results, namespace=cache_namespace)
     
     return SearchResponse(
-        results=[
-            SearchResult(**r) for r in results["results"]
-        ],
+        results=SEARCH_RESULT_LIST.validate_python(results["results"]),
         searched_tiers=results["searched_tiers"],
         total_found=results["total_found"],
-        query=results["query"]
+        query=query.query
     )
 
 
@@ -341,24 +378,16 @@ async def find_similar_tickets(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Find similar past tickets based on embedding similarity."""
-    # Get ticket embedding
-    result = await session.execute(
-        select(TicketEmbedding).where(TicketEmbedding.ticket_id == ticket_id)
-    )
-    embedding_record = result.scalar_one_or_none()
-    
-    if not embedding_record:
-        raise HTTPException(status_code=404, detail="Ticket embedding not found")
-    
-    import numpy as np
-    query_embedding = np.array(embedding_record.embedding)
-    
-    similar = await semantic_search_service.find_similar_tickets(
+    # Query vector is read from the stored embedding inside the same statement
+    similar = await semantic_search_service.find_similar_to_ticket(
         session=session,
-        query_embedding=query_embedding,
+        ticket_id=ticket_id,
         limit=limit
     )
     
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Ticket embedding not found")
+    
     return {"similar_tickets": similar}
 
 
@@ -372,26 +401,20 @@ async def list_knowledge_base(
     session: AsyncSession = Depends(get_async_session)
 ):
     """List knowledge base entries."""
-    tier_enum = KnowledgeTier(tier) if tier else None
-    
-    if tier_enum:
-        results = await knowledge_base_service.get_by_tier(
-            session=session,
-            tier=tier_enum,
-            category=category,
-            limit=limit
-        )
+    if tier:
+        tiers = KnowledgeTier(tier)
+        per_tier = limit
     else:
-        # Get all tiers
-        results = []
-        for t in [KnowledgeTier.L1, KnowledgeTier.L2, KnowledgeTier.L3]:
-            tier_results = await knowledge_base_service.get_by_tier(
-                session=session,
-                tier=t,
-                category=category,
-                limit=limit // 3
-            )
-            results.extend(tier_results)
+        # All tiers in one window-ranked query
+        tiers = [KnowledgeTier.L1, KnowledgeTier.L2, KnowledgeTier.L3]
+        per_tier = limit // 3
+    
+    results = await knowledge_base_service.get_by_tier(
+        session=session,
+        tier=tiers,
+        category=category,
+        limit=per_tier
+    )
     
     return {"knowledge_base": results, "count": len(results)}
 
@@ -428,6 +451,8 @@ async def create_knowledge_entry(
     )
     
     await session.commit()
+    search_cache.clear()
+    kb_vector_index.invalidate()
     return result
 
 
@@ -460,12 +485,15 @@ async def run_auto_promotion(
     """Manually trigger auto-promotion check."""
     promotions = await auto_promotion_service.check_and_promote(session)
     await session.commit()
+    if promotions:
+        search_cache.clear()
+        kb_vector_index.invalidate()
     
-    return {
+    return ORJSONResponse(content={
         "promotions": promotions,
         "count": len(promotions),
         "message": f"Auto-promotion completed. {len(promotions)} entries promoted."
-    }
+    })
 
 
 @router.post("/knowledge/{kb_id}/promote", tags=["Auto-Promotion"])
@@ -488,6 +516,8 @@ async def manual_promote(
         raise HTTPException(status_code=404, detail="Knowledge base entry not found")
     
     await session.commit()
+    search_cache.clear()
+    kb_vector_index.invalidate()
     return PromotionResponse(**result)
 
 
@@ -503,109 +533,64 @@ async def get_promotion_history(
         kb_id=kb_id,
         limit=limit
     )
-    return {"history": history, "count": len(history)}
+    return ORJSONResponse(content={"history": history, "count": len(history)})
 
 
 # ============== Analytics Endpoints ==============
 
+ANALYTICS_QUERY = text("""
+    SELECT
+        total_tickets,
+        open_tickets,
+        resolved_tickets,
+        avg_resolution_time,
+        avg_feedback,
+        urgency_distribution,
+        tier_distribution,
+        category_distribution,
+        knowledge_base_stats
+    FROM analytics_snapshot
+    LIMIT 1
+""").columns(
+    total_tickets=Integer,
+    open_tickets=Integer,
+    resolved_tickets=Integer,
+    avg_resolution_time=Float,
+    avg_feedback=Float,
+    urgency_distribution=JSONB,
+    tier_distribution=JSONB,
+    category_distribution=JSONB,
+    knowledge_base_stats=JSONB
+)
+
+
 @router.get("/analytics", response_model=AnalyticsResponse, tags=["Analytics"])
 async def get_analytics(
     session: AsyncSession = Depends(get_async_session)
 ):
     """Get dashboard analytics for tickets and knowledge base."""
     
-    # Ticket statistics
-    total_result = await session.execute(select(func.count(Ticket.id)))
-    total_tickets = total_result.scalar() or 0
-    
-    open_result = await session.execute(
-        select(func.count(Ticket.id)).where(Ticket.status == TicketStatus.OPEN)
-    )
-    open_tickets = open_result.scalar() or 0
-    
-    resolved_result = await session.execute(
-        select(func.count(Ticket.id)).where(Ticket.status == TicketStatus.RESOLVED)
-    )
-    resolved_tickets = resolved_result.scalar() or 0
-    
-    # Average resolution time
-    avg_time_result = await session.execute(
-        select(func.avg(Resolution.resolution_time_minutes))
-    )
-    avg_resolution_time = avg_time_result.scalar()
-    
-    # Urgency distribution
-    urgency_query = await session.execute(
-        select(Ticket.urgency_level, func.count(Ticket.id))
-        .group_by(Ticket.urgency_level)
-    )
-    urgency_dist = {
-        row[0].value if row[0] else "unknown": row[1] 
-        for row in urgency_query.fetchall()
-    }
-    
-    # Tier distribution
-    tier_query = await session.execute(
-        select(Ticket.assigned_tier, func.count(Ticket.id))
-        .group_by(Ticket.assigned_tier)
-    )
-    tier_dist = {
-        row[0].value if row[0] else "unknown": row[1] 
-        for row in tier_query.fetchall()
-    }
-    
-    # Category distribution
-    category_query = await session.execute(
-        select(Ticket.category, func.count(Ticket.id))
-        .where(Ticket.category.isnot(None))
-        .group_by(Ticket.category)
-    )
-    category_dist = {row[0]: row[1] for row in category_query.fetchall()}
-    
-    # Average feedback score
-    avg_feedback_result = await session.execute(
-        select(func.avg(Resolution.feedback_score))
-        .where(Resolution.feedback_score.isnot(None))
-    )
-    avg_feedback = avg_feedback_result.scalar()
-    
-    # Knowledge base statistics
-    kb_stats_query = await session.execute(
-        select(
-            KnowledgeBase.tier,
-            func.count(KnowledgeBase.id),
-            func.avg(KnowledgeBase.usage_count),
-            func.avg(KnowledgeBase.avg_feedback_score)
-        )
-        .where(KnowledgeBase.is_active == True)
-        .group_by(KnowledgeBase.tier)
-    )
+    # Aggregates are precomputed in the analytics_snapshot materialized view
+    result = await session.execute(ANALYTICS_QUERY)
+    row = result.mappings().one()
     
-    kb_stats = {}
-    for row in kb_stats_query.fetchall():
-        tier_name = row[0].value if row[0] else "unknown"
-        kb_stats[tier_name] = {
-            "count": row[1],
-            "avg_usage": float(row[2]) if row[2] else 0,
-            "avg_feedback": float(row[3]) if row[3] else 0
-        }
-    
-    return AnalyticsResponse(
-        total_tickets=total_tickets,
-        open_tickets=open_tickets,
-        resolved_tickets=resolved_tickets,
-        avg_resolution_time_minutes=float(avg_resolution_time) if avg_resolution_time else None,
-        urgency_distribution=urgency_dist,
-        tier_distribution=tier_dist,
-        category_distribution=category_dist,
-        avg_feedback_score=float(avg_feedback) if avg_feedback else None,
-        knowledge_base_stats=kb_stats
-    )
+    # Rows are already JSON-shaped; skip re-validating through AnalyticsResponse
+    return ORJSONResponse(content={
+        "total_tickets": row["total_tickets"] or 0,
+        "open_tickets": row["open_tickets"] or 0,
+        "resolved_tickets": row["resolved_tickets"] or 0,
+        "avg_resolution_time_minutes": row["avg_resolution_time"],
+        "urgency_distribution": row["urgency_distribution"],
+        "tier_distribution": row["tier_distribution"],
+        "category_distribution": row["category_distribution"],
+        "avg_feedback_score": row["avg_feedback"],
+        "knowledge_base_stats": row["knowledge_base_stats"]
+    })
 
 
 # ============== Utility Endpoints ==============
 
-@router.post("/analyze", tags=["Utilities"])
+@router.post("/analyze", tags=["Utilities"], dependencies=[Depends(wait_for_models)])
 async def analyze_text(
     title: str = Query(..., description="Text title"),
     description: str = Query(..., description="Text description")
@@ -616,23 +601,19 @@ async def analyze_text(
     """
     combined_text = f"{title} {description}"
     
-    sentiment_result = sentiment_analyzer.analyze(combined_text)
+    # Previews always run the model and never touch the sentiment cache
+    sentiment_result = await sentiment_batcher.submit(combined_text)
     urgency_result = urgency_calculator.calculate(
         title=title,
-        description=description
+        description=description,
+        sentiment_result=sentiment_result
     )
     
-    return {
+    return ORJSONResponse(content={
         "sentiment": {
             "label": sentiment_result["label"],
             "score": sentiment_result["score"],
             "confidence": sentiment_result["confidence"]
         },
-        "urgency": {
-            "score": urgency_result.score,
-            "level": urgency_result.level.value,
-            "tier": urgency_result.tier.value,
-            "factors": urgency_result.factors,
-            "explanation": urgency_result.explanation
-        }
-    }
+        "urgency": urgency_result.to_dict()
+    })
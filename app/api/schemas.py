@@ -2,7 +2,7 @@
 Pydantic schemas for API request/response validation.
 """
 
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, TypeAdapter
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
@@ -42,8 +42,8 @@ class TicketCreate(BaseModel):
     category: Optional[str] = Field(None, description="Optional category")
     user_tier: Optional[str] = Field(None, description="User subscription tier")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "title": "Cannot access email - Outlook not syncing",
                 "description": "I have been unable to access my email since this morning. Outlook shows 'disconnected' and won't sync. I've tried restarting but the issue persists. This is urgent as I have important client emails.",
@@ -51,6 +51,7 @@ class TicketCreate(BaseModel):
                 "category": "email"
             }
         }
+    )
 
 
 class TicketResolve(BaseModel):
@@ -68,8 +69,8 @@ class TicketResolve(BaseModel):
     feedback_comment: Optional[str] = Field(None, description="Optional feedback comment")
     resolved_by: Optional[str] = Field(None, description="Resolver name/email")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "solution": "Reset Outlook profile and reconfigured email account. Issue was caused by corrupted cache.",
                 "resolution_source": "L2_KB",
@@ -78,6 +79,7 @@ class TicketResolve(BaseModel):
                 "resolved_by": "support@company.com"
             }
         }
+    )
 
 
 class SearchQuery(BaseModel):
@@ -88,14 +90,15 @@ class SearchQuery(BaseModel):
     top_k: Optional[int] = Field(5, ge=1, le=20, description="Number of results")
     cascade: Optional[bool] = Field(True, description="Enable cascading search")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "query": "outlook email not syncing disconnected",
                 "tier": None,
                 "top_k": 5
             }
         }
+    )
 
 
 class KnowledgeCreate(BaseModel):
@@ -106,8 +109,8 @@ class KnowledgeCreate(BaseModel):
     keywords: Optional[List[str]] = Field(None)
     category: Optional[str] = Field(None)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "tier": "L1",
                 "title": "How to Clear Browser Cache",
@@ -116,6 +119,7 @@ class KnowledgeCreate(BaseModel):
                 "category": "software"
             }
         }
+    )
 
 
 class PromoteRequest(BaseModel):
@@ -143,6 +147,8 @@ class SentimentAnalysis(BaseModel):
 
 class TicketResponse(BaseModel):
     """Full ticket response."""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     title: str
     description: str
@@ -170,6 +176,8 @@ class TicketCreateResponse(BaseModel):
 
 class SearchResult(BaseModel):
     """Single search result."""
+    model_config = ConfigDict(extra="ignore")
+    
     id: int
     tier: str
     title: str
@@ -183,6 +191,10 @@ class SearchResult(BaseModel):
     hybrid_score: float
 
 
+# Validates a whole result list in one pydantic-core call
+SEARCH_RESULT_LIST = TypeAdapter(List[SearchResult])
+
+
 class SearchResponse(BaseModel):
     """Search response with results."""
     results: List[SearchResult]
@@ -237,6 +249,9 @@ class AnalyticsResponse(BaseModel):
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
+    ready: bool = True
     database: str
     models_loaded: Dict[str, bool]
+    search_cache: Dict[str, Any] = {}
+    sentiment_cache: Dict[str, Any] = {}
     version: str
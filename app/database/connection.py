@@ -5,8 +5,10 @@ Supports both async (for API) and sync (for ML operations) connections.
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
 from contextlib import asynccontextmanager
+import time
 from typing import AsyncGenerator
 
 from app.config import get_settings
@@ -19,21 +21,55 @@ Base = declarative_base()
 # Async engine for FastAPI endpoints
 async_engine = create_async_engine(
     settings.database_url,
-    echo=settings.debug,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True
+    echo=False,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle,
+    connect_args={
+        # asyncpg's server-side prepared statements, plus SQLAlchemy's
+        # client-side cache of them, so repeated queries skip parse/plan
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        # Short OLTP queries never amortize JIT compilation. The HNSW
+        # search list must be at least ANN_CANDIDATES long or index scans
+        # return fewer candidates than requested.
+        "server_settings": {
+            "jit": "off",
+            "hnsw.ef_search": str(max(settings.hnsw_ef_search, settings.ann_candidates))
+        }
+    }
 )
 
-# Sync engine for ML operations that don't support async
+# Sync engine for ML operations that don't support async. Rarely used, so
+# it opens connections on demand instead of holding an idle pool.
 sync_engine = create_engine(
     settings.database_url_sync,
-    echo=settings.debug,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True
+    echo=False,
+    poolclass=NullPool
 )
 
+
+def _log_slow_queries(engine) -> None:
+    """Print statements that run longer than SLOW_QUERY_MS."""
+
+    # The start time lives on the execution context, so a statement that
+    # raises (and never reaches after_cursor_execute) leaves nothing behind
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _check_elapsed(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_start) * 1000
+        if elapsed_ms > settings.slow_query_ms:
+            print(f"Slow query ({elapsed_ms:.1f} ms): {' '.join(statement.split())[:500]}")
+
+
+_log_slow_queries(async_engine.sync_engine)
+_log_slow_queries(sync_engine)
+
 # Session factories
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
@@ -50,11 +86,16 @@ SyncSessionLocal = sessionmaker(
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency for FastAPI to get async database session."""
+    """
+    Dependency for FastAPI to get async database session.
+    
+    Nothing is committed implicitly: write endpoints call
+    `session.commit()` themselves, and read-only requests just roll back
+    their transaction when the session closes.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
         except Exception:
             await session.rollback()
             raise
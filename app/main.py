@@ -3,12 +3,13 @@ SupportIQ: IT Support Automation via Tiered RAG
 Main FastAPI application entry point.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
 from app.config import get_settings
@@ -23,6 +24,30 @@ STATIC_DIR = PROJECT_ROOT / "static"
 settings = get_settings()
 
 
+async def _preload_models() -> None:
+    """Load both models in parallel, then run a warmup pass on each."""
+    print("Loading ML models (MiniLM + BERT)... This may take 1-2 minutes...")
+    from app.services.semantic_search import semantic_search_service
+    from app.services.sentiment import sentiment_analyzer
+    
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(semantic_search_service.load),
+            asyncio.to_thread(sentiment_analyzer.load)
+        )
+        
+        # Warmup passes so the first request doesn't pay for lazy allocations
+        await asyncio.gather(
+            asyncio.to_thread(semantic_search_service.encode, "warmup"),
+            asyncio.to_thread(sentiment_analyzer.analyze, "warmup")
+        )
+    except Exception as e:
+        print(f"Model preload failed, falling back to lazy loading: {e}")
+        return
+    
+    print("All models loaded successfully!")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -33,19 +58,22 @@ async def lifespan(app: FastAPI):
     print(f"Starting SupportIQ v{__version__}")
     print(f"Database: {settings.database_url[:50]}...")
     
-    # Pre-load models to avoid first-request latency
-    print("Loading ML models (MiniLM + BERT)... This may take 1-2 minutes...")
-    from app.services.semantic_search import semantic_search_service
-    from app.services.sentiment import sentiment_analyzer
-    _ = semantic_search_service  # Triggers initialization
-    _ = sentiment_analyzer
+    # Load models in the background so non-ML endpoints serve immediately;
+    # ML endpoints wait on this task (see app.api.routes.wait_for_models)
+    app.state.model_task = asyncio.create_task(_preload_models())
     
-    print("All models loaded successfully!")
+    # Keep the dashboard analytics snapshot fresh in the background
+    from app.services.analytics import analytics_refresh_loop
+    refresh_task = asyncio.create_task(analytics_refresh_loop())
     
     yield
     
     # Shutdown: Clean up resources
     print("🛑 Shutting down SupportIQ...")
+    for task in (refresh_task, app.state.model_task):
+        task.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await task
     await close_db()
     print("👋 Goodbye!")
 
@@ -78,6 +106,7 @@ SupportIQ is an intelligent IT support automation platform featuring:
     """,
     version=__version__,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -85,10 +114,11 @@ SupportIQ is an intelligent IT support automation platform featuring:
 # CORS middleware for frontend integration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=settings.cors_origins_list,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # Include API routes
@@ -97,35 +127,34 @@ app.include_router(router, prefix=settings.api_prefix)
 # Mount static files
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
-
-
-# Root endpoint - serve the Query Resolution UI
-@app.get("/")
-async def root():
-    """Serve the Query Resolution UI."""
-    index_path = STATIC_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(str(index_path))
-    return {
-        "name": "SupportIQ",
-        "version": __version__,
-        "description": "IT Support Automation via Tiered RAG",
-        "docs": "/docs",
-        "features": [
-            "MiniLM Semantic Search",
-            "BERT Sentiment Analysis",
-            "Dynamic Urgency Scoring (1-10)",
-            "Tiered Knowledge Base (L1/L2/L3)",
-            "Auto-Promotion Engine"
-        ],
-        "endpoints": {
-            "tickets": f"{settings.api_prefix}/tickets",
-            "search": f"{settings.api_prefix}/search",
-            "knowledge": f"{settings.api_prefix}/knowledge",
-            "analytics": f"{settings.api_prefix}/analytics",
-            "health": f"{settings.api_prefix}/health"
+    # Serve the Query Resolution UI at / (index.html); mounted last so the
+    # API and docs routes above take precedence
+    app.mount("/", StaticFiles(directory=str(STATIC_DIR), html=True), name="root")
+else:
+    # Root endpoint - API info when the UI isn't bundled
+    @app.get("/")
+    async def root():
+        """Return basic API information."""
+        return {
+            "name": "SupportIQ",
+            "version": __version__,
+            "description": "IT Support Automation via Tiered RAG",
+            "docs": "/docs",
+            "features": [
+                "MiniLM Semantic Search",
+                "BERT Sentiment Analysis",
+                "Dynamic Urgency Scoring (1-10)",
+                "Tiered Knowledge Base (L1/L2/L3)",
+                "Auto-Promotion Engine"
+            ],
+            "endpoints": {
+                "tickets": f"{settings.api_prefix}/tickets",
+                "search": f"{settings.api_prefix}/search",
+                "knowledge": f"{settings.api_prefix}/knowledge",
+                "analytics": f"{settings.api_prefix}/analytics",
+                "health": f"{settings.api_prefix}/health"
+            }
         }
-    }
 
 
 if __name__ == "__main__":
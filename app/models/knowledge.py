@@ -5,9 +5,10 @@ Includes KnowledgeBase and PromotionHistory tables.
 
 from sqlalchemy import (
     Column, Integer, String, Text, Float, Boolean,
-    ForeignKey, DateTime, Enum as SQLEnum, ARRAY
+    ForeignKey, DateTime, Enum as SQLEnum, ARRAY, Computed
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
 
@@ -32,6 +33,11 @@ class KnowledgeBase(Base):
     success_rate = Column(Float, default=0.0)
     avg_feedback_score = Column(Float, default=0.0)
     embedding = Column(Vector(384))  # MiniLM-L6 embeddings
+    # Stored full-text vector for keyword search (GIN-indexed); never loaded by the ORM
+    search_tsv = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', title || ' ' || content)", persisted=True)
+    ))
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
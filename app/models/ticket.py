@@ -39,6 +39,10 @@ class KnowledgeTier(str, enum.Enum):
     L3 = "L3"
 
 
+# Plain-dict value lookup; avoids the enum `.value` descriptor in hot loops
+TIER_VALUES = {tier: tier.value for tier in KnowledgeTier}
+
+
 class Ticket(Base):
     """Support ticket model."""
     __tablename__ = "tickets"
@@ -13,7 +13,18 @@ __all__ = [
     "KnowledgeBaseService",
     "knowledge_base_service",
     "AutoPromotionService",
-    "auto_promotion_service"
+    "auto_promotion_service",
+    "MicroBatcher",
+    "sentiment_batcher",
+    "embedding_batcher",
+    "inference_executor",
+    "run_inference",
+    "SemanticCache",
+    "search_cache",
+    "sentiment_cache",
+    "KnowledgeVectorIndex",
+    "kb_vector_index",
+    "refresh_analytics_snapshot"
 ]
 
 # Lazy attribute access
@@ -48,4 +59,37 @@ def __getattr__(name):
     elif name == "auto_promotion_service":
         from app.services.auto_promote import auto_promotion_service
         return auto_promotion_service
+    elif name == "MicroBatcher":
+        from app.services.inference import MicroBatcher
+        return MicroBatcher
+    elif name == "sentiment_batcher":
+        from app.services.inference import sentiment_batcher
+        return sentiment_batcher
+    elif name == "embedding_batcher":
+        from app.services.inference import embedding_batcher
+        return embedding_batcher
+    elif name == "inference_executor":
+        from app.services.inference import inference_executor
+        return inference_executor
+    elif name == "run_inference":
+        from app.services.inference import run_inference
+        return run_inference
+    elif name == "SemanticCache":
+        from app.services.semantic_cache import SemanticCache
+        return SemanticCache
+    elif name == "search_cache":
+        from app.services.semantic_cache import search_cache
+        return search_cache
+    elif name == "sentiment_cache":
+        from app.services.semantic_cache import sentiment_cache
+        return sentiment_cache
+    elif name == "KnowledgeVectorIndex":
+        from app.services.vector_index import KnowledgeVectorIndex
+        return KnowledgeVectorIndex
+    elif name == "kb_vector_index":
+        from app.services.vector_index import kb_vector_index
+        return kb_vector_index
+    elif name == "refresh_analytics_snapshot":
+        from app.services.analytics import refresh_analytics_snapshot
+        return refresh_analytics_snapshot
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,51 @@
+"""
+Analytics Snapshot Service.
+Keeps the analytics_snapshot materialized view fresh in the background.
+"""
+
+import asyncio
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database.connection import get_async_context_session
+
+settings = get_settings()
+
+REFRESH_SNAPSHOT = text("REFRESH MATERIALIZED VIEW CONCURRENTLY analytics_snapshot")
+
+# Every uvicorn worker runs the refresh loop; a transaction-level advisory
+# lock lets one of them refresh per interval while the others skip
+REFRESH_LOCK_KEY = 7_150_001
+TRY_REFRESH_LOCK = text("SELECT pg_try_advisory_xact_lock(:key)")
+
+
+async def refresh_analytics_snapshot() -> bool:
+    """
+    Recompute the dashboard aggregates without blocking readers.
+    
+    Returns:
+        False if another process is already refreshing the snapshot
+    """
+    async with get_async_context_session() as session:
+        locked = await session.scalar(TRY_REFRESH_LOCK, {"key": REFRESH_LOCK_KEY})
+        if not locked:
+            return False
+        await session.execute(REFRESH_SNAPSHOT)
+    return True
+
+
+async def analytics_refresh_loop(interval: float = None) -> None:
+    """
+    Refresh the analytics snapshot forever on a fixed interval.
+    
+    Args:
+        interval: Seconds between refreshes
+    """
+    interval = interval or settings.analytics_refresh_seconds
+    
+    while True:
+        try:
+            await refresh_analytics_snapshot()
+        except Exception as e:
+            print(f"Analytics snapshot refresh failed: {e}")
+        await asyncio.sleep(interval)
@@ -7,15 +7,28 @@ L2 -> L1 when resolved >25 times with high feedback
 
 from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_
-from datetime import datetime
+from sqlalchemy import select, update, insert, text, and_, or_, func, cast, Float, Numeric
+from datetime import datetime, timezone
 
 from app.models.knowledge import KnowledgeBase, PromotionHistory
-from app.models.ticket import KnowledgeTier
+from app.models.ticket import KnowledgeTier, TIER_VALUES
 from app.config import get_settings
 
 settings = get_settings()
 
+# Moves an entry to a new tier and hands back its previous tier in one
+# round trip; the CTE locks the row so concurrent promotions serialize
+FORCE_PROMOTE_QUERY = text("""
+    WITH prev AS (
+        SELECT id, tier FROM knowledge_base WHERE id = :kb_id FOR UPDATE
+    )
+    UPDATE knowledge_base kb
+    SET tier = CAST(:to_tier AS knowledge_tier), updated_at = now()
+    FROM prev
+    WHERE kb.id = prev.id
+    RETURNING prev.tier AS from_tier, kb.title, kb.usage_count, kb.avg_feedback_score
+""")
+
 
 class AutoPromotionService:
     """
@@ -31,6 +44,12 @@ class AutoPromotionService:
         self.l3_to_l2_threshold = settings.l3_to_l2_threshold
         self.l2_to_l1_threshold = settings.l2_to_l1_threshold
         self.min_feedback_score = settings.min_feedback_score
+        
+        # from_tier -> (to_tier, usage threshold)
+        self.promotion_paths = {
+            KnowledgeTier.L3: (KnowledgeTier.L2, self.l3_to_l2_threshold),
+            KnowledgeTier.L2: (KnowledgeTier.L1, self.l2_to_l1_threshold)
+        }
     
     async def check_and_promote(
         self,
@@ -39,137 +58,110 @@ class AutoPromotionService:
         """
         Check all entries for promotion eligibility and promote if qualified.
         
-        Returns:
-            List of promoted entries with details
-        """
-        promotions = []
-        
-        # Check L3 -> L2 promotions
-        l3_promotions = await self._check_tier_promotions(
-            session=session,
-            from_tier=KnowledgeTier.L3,
-            to_tier=KnowledgeTier.L2,
-            usage_threshold=self.l3_to_l2_threshold
-        )
-        promotions.extend(l3_promotions)
-        
-        # Check L2 -> L1 promotions
-        l2_promotions = await self._check_tier_promotions(
-            session=session,
-            from_tier=KnowledgeTier.L2,
-            to_tier=KnowledgeTier.L1,
-            usage_threshold=self.l2_to_l1_threshold
-        )
-        promotions.extend(l2_promotions)
-        
-        return promotions
-    
-    async def _check_tier_promotions(
-        self,
-        session: AsyncSession,
-        from_tier: KnowledgeTier,
-        to_tier: KnowledgeTier,
-        usage_threshold: int
-    ) -> List[Dict[str, Any]]:
-        """
-        Check and execute promotions for a specific tier transition.
+        Eligibility for every tier transition is resolved in one query; an
+        anti-join against promotion history skips entries that were already
+        promoted along the same path.
         
-        Args:
-            session: Database session
-            from_tier: Source tier
-            to_tier: Target tier
-            usage_threshold: Minimum usage count for promotion
-            
         Returns:
-            List of promoted entries
+            List of promoted entries with details (tiers and timestamps
+            are left as enums/datetimes for the JSON encoder)
         """
-        # Find entries eligible for promotion
+        paths = self.promotion_paths
+        
         result = await session.execute(
-            select(KnowledgeBase).where(
+            select(KnowledgeBase)
+            .outerjoin(
+                PromotionHistory,
+                and_(
+                    PromotionHistory.knowledge_id == KnowledgeBase.id,
+                    PromotionHistory.from_tier == KnowledgeBase.tier,
+                    or_(*[
+                        and_(KnowledgeBase.tier == from_tier, PromotionHistory.to_tier == to_tier)
+                        for from_tier, (to_tier, _) in paths.items()
+                    ])
+                )
+            )
+            .where(
                 and_(
-                    KnowledgeBase.tier == from_tier,
                     KnowledgeBase.is_active == True,
-                    KnowledgeBase.usage_count >= usage_threshold,
-                    KnowledgeBase.avg_feedback_score >= self.min_feedback_score
+                    KnowledgeBase.avg_feedback_score >= self.min_feedback_score,
+                    or_(*[
+                        and_(KnowledgeBase.tier == from_tier, KnowledgeBase.usage_count >= threshold)
+                        for from_tier, (_, threshold) in paths.items()
+                    ]),
+                    PromotionHistory.id.is_(None)
                 )
             )
+            .order_by(KnowledgeBase.tier.desc(), KnowledgeBase.id)
         )
         eligible_entries = result.scalars().all()
         
         promotions = []
+        to_update: Dict[KnowledgeTier, List[int]] = {}
+        history_rows = []
+        # One timestamp for the whole batch
+        now = datetime.now(timezone.utc)
+        
         for entry in eligible_entries:
-            # Check if already promoted (avoid duplicate promotions)
-            existing_promotion = await session.execute(
-                select(PromotionHistory).where(
-                    and_(
-                        PromotionHistory.knowledge_id == entry.id,
-                        PromotionHistory.from_tier == from_tier,
-                        PromotionHistory.to_tier == to_tier
-                    )
-                )
-            )
+            from_tier = entry.tier
+            to_tier = paths[from_tier][0]
             
-            if existing_promotion.scalar_one_or_none():
-                continue  # Already promoted
-            
-            # Execute promotion
-            await self._promote_entry(
-                session=session,
-                entry=entry,
-                from_tier=from_tier,
-                to_tier=to_tier
-            )
+            to_update.setdefault(to_tier, []).append(entry.id)
+            history_rows.append(self._build_history(entry, from_tier, to_tier))
             
             promotions.append({
                 "id": entry.id,
                 "title": entry.title,
-                "from_tier": from_tier.value,
-                "to_tier": to_tier.value,
+                "from_tier": from_tier,
+                "to_tier": to_tier,
                 "usage_count": entry.usage_count,
                 "avg_feedback": entry.avg_feedback_score,
-                "promoted_at": datetime.now().isoformat()
+                "promoted_at": now
             })
         
+        # One UPDATE per target tier instead of one per entry
+        for to_tier, ids in to_update.items():
+            await session.execute(
+                update(KnowledgeBase)
+                .where(KnowledgeBase.id.in_(ids))
+                .values(tier=to_tier)
+            )
+        # Multi-row INSERT without building ORM objects
+        if history_rows:
+            await session.execute(insert(PromotionHistory), history_rows)
+        
         return promotions
     
-    async def _promote_entry(
+    def _build_history(
         self,
-        session: AsyncSession,
         entry: KnowledgeBase,
         from_tier: KnowledgeTier,
         to_tier: KnowledgeTier
-    ) -> None:
+    ) -> Dict[str, Any]:
         """
-        Promote a single entry and record in history.
+        Build the history row values for an automatic promotion.
         
         Args:
-            session: Database session
-            entry: Knowledge base entry to promote
+            entry: Knowledge base entry being promoted
             from_tier: Source tier
             to_tier: Target tier
+            
+        Returns:
+            Column values for a PromotionHistory insert
         """
         reason = (
             f"Auto-promoted: usage_count={entry.usage_count} >= threshold, "
             f"avg_feedback={entry.avg_feedback_score:.2f} >= {self.min_feedback_score}"
         )
         
-        # Update entry tier
-        await session.execute(
-            update(KnowledgeBase)
-            .where(KnowledgeBase.id == entry.id)
-            .values(tier=to_tier)
-        )
-        
-        # Record promotion history
-        history = PromotionHistory(
-            knowledge_id=entry.id,
-            from_tier=from_tier,
-            to_tier=to_tier,
-            reason=reason,
-            usage_count_at_promotion=entry.usage_count,
-            avg_feedback_at_promotion=entry.avg_feedback_score
-        )
-        session.add(history)
+        return {
+            "knowledge_id": entry.id,
+            "from_tier": from_tier,
+            "to_tier": to_tier,
+            "reason": reason,
+            "usage_count_at_promotion": entry.usage_count,
+            "avg_feedback_at_promotion": entry.avg_feedback_score
+        }
     
     async def force_promote(
         self,
@@ -191,38 +183,33 @@ class AutoPromotionService:
             Promotion details or None if entry not found
         """
         result = await session.execute(
-            select(KnowledgeBase).where(KnowledgeBase.id == kb_id)
+            FORCE_PROMOTE_QUERY,
+            {"kb_id": kb_id, "to_tier": TIER_VALUES[to_tier]}
         )
-        entry = result.scalar_one_or_none()
+        entry = result.one_or_none()
         
         if not entry:
             return None
         
-        from_tier = entry.tier
-        
-        # Update entry
-        await session.execute(
-            update(KnowledgeBase)
-            .where(KnowledgeBase.id == kb_id)
-            .values(tier=to_tier)
-        )
+        from_tier = KnowledgeTier(entry.from_tier)
         
         # Record history
-        history = PromotionHistory(
-            knowledge_id=kb_id,
-            from_tier=from_tier,
-            to_tier=to_tier,
-            reason=reason,
-            usage_count_at_promotion=entry.usage_count,
-            avg_feedback_at_promotion=entry.avg_feedback_score
+        await session.execute(
+            insert(PromotionHistory).values(
+                knowledge_id=kb_id,
+                from_tier=from_tier,
+                to_tier=to_tier,
+                reason=reason,
+                usage_count_at_promotion=entry.usage_count,
+                avg_feedback_at_promotion=entry.avg_feedback_score
+            )
         )
-        session.add(history)
         
         return {
             "id": kb_id,
             "title": entry.title,
-            "from_tier": from_tier.value,
-            "to_tier": to_tier.value,
+            "from_tier": TIER_VALUES[from_tier],
+            "to_tier": TIER_VALUES[to_tier],
             "reason": reason
         }
     
@@ -241,9 +228,21 @@ class AutoPromotionService:
             limit: Maximum results
             
         Returns:
-            List of promotion history records
+            List of promotion history records (tiers and timestamps
+            are left as enums/datetimes for the JSON encoder)
         """
-        query = select(PromotionHistory).order_by(
+        # Column rows rather than ORM entities; the result is consumed once
+        # straight into the response dicts
+        query = select(
+            PromotionHistory.id,
+            PromotionHistory.knowledge_id,
+            PromotionHistory.from_tier,
+            PromotionHistory.to_tier,
+            PromotionHistory.reason,
+            PromotionHistory.usage_count_at_promotion,
+            PromotionHistory.avg_feedback_at_promotion,
+            PromotionHistory.promoted_at
+        ).order_by(
             PromotionHistory.promoted_at.desc()
         )
         
@@ -253,20 +252,19 @@ class AutoPromotionService:
         query = query.limit(limit)
         
         result = await session.execute(query)
-        records = result.scalars().all()
         
         return [
             {
                 "id": record.id,
                 "knowledge_id": record.knowledge_id,
-                "from_tier": record.from_tier.value,
-                "to_tier": record.to_tier.value,
+                "from_tier": record.from_tier,
+                "to_tier": record.to_tier,
                 "reason": record.reason,
                 "usage_count": record.usage_count_at_promotion,
                 "avg_feedback": record.avg_feedback_at_promotion,
-                "promoted_at": record.promoted_at.isoformat() if record.promoted_at else None
+                "promoted_at": record.promoted_at
             }
-            for record in records
+            for record in result
         ]
     
     async def get_promotion_candidates(
@@ -279,60 +277,41 @@ class AutoPromotionService:
         Returns:
             Dictionary with L3_to_L2 and L2_to_L1 candidates
         """
-        candidates = {
-            "L3_to_L2": [],
-            "L2_to_L1": []
-        }
-        
-        # L3 entries approaching promotion
-        l3_result = await session.execute(
-            select(KnowledgeBase).where(
-                and_(
-                    KnowledgeBase.tier == KnowledgeTier.L3,
-                    KnowledgeBase.is_active == True,
-                    KnowledgeBase.usage_count >= self.l3_to_l2_threshold * 0.7  # 70% threshold
-                )
-            ).order_by(KnowledgeBase.usage_count.desc())
-        )
+        candidates = {}
         
-        for entry in l3_result.scalars().all():
-            progress = min(100, (entry.usage_count / self.l3_to_l2_threshold) * 100)
-            feedback_ok = entry.avg_feedback_score >= self.min_feedback_score
-            
-            candidates["L3_to_L2"].append({
-                "id": entry.id,
-                "title": entry.title,
-                "usage_count": entry.usage_count,
-                "threshold": self.l3_to_l2_threshold,
-                "progress_percent": round(progress, 1),
-                "avg_feedback": entry.avg_feedback_score,
-                "feedback_qualified": feedback_ok
-            })
-        
-        # L2 entries approaching promotion
-        l2_result = await session.execute(
-            select(KnowledgeBase).where(
-                and_(
-                    KnowledgeBase.tier == KnowledgeTier.L2,
-                    KnowledgeBase.is_active == True,
-                    KnowledgeBase.usage_count >= self.l2_to_l1_threshold * 0.7
-                )
-            ).order_by(KnowledgeBase.usage_count.desc())
-        )
-        
-        for entry in l2_result.scalars().all():
-            progress = min(100, (entry.usage_count / self.l2_to_l1_threshold) * 100)
-            feedback_ok = entry.avg_feedback_score >= self.min_feedback_score
+        for from_tier, (to_tier, threshold) in self.promotion_paths.items():
+            # Only the reported columns; skips loading content and embeddings.
+            # Progress and the feedback check are computed by the database.
+            progress = func.least(cast(KnowledgeBase.usage_count, Numeric) * 100 / threshold, 100)
+            result = await session.execute(
+                select(
+                    KnowledgeBase.id,
+                    KnowledgeBase.title,
+                    KnowledgeBase.usage_count,
+                    KnowledgeBase.avg_feedback_score,
+                    cast(func.round(progress, 1), Float).label("progress"),
+                    (KnowledgeBase.avg_feedback_score >= self.min_feedback_score).label("feedback_ok")
+                ).where(
+                    and_(
+                        KnowledgeBase.tier == from_tier,
+                        KnowledgeBase.is_active == True,
+                        KnowledgeBase.usage_count >= threshold * 0.7  # 70% threshold
+                    )
+                ).order_by(KnowledgeBase.usage_count.desc()).limit(50)
+            )
             
-            candidates["L2_to_L1"].append({
-                "id": entry.id,
-                "title": entry.title,
-                "usage_count": entry.usage_count,
-                "threshold": self.l2_to_l1_threshold,
-                "progress_percent": round(progress, 1),
-                "avg_feedback": entry.avg_feedback_score,
-                "feedback_qualified": feedback_ok
-            })
+            candidates[f"{TIER_VALUES[from_tier]}_to_{TIER_VALUES[to_tier]}"] = [
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "usage_count": row.usage_count,
+                    "threshold": threshold,
+                    "progress_percent": row.progress,
+                    "avg_feedback": row.avg_feedback_score,
+                    "feedback_qualified": row.feedback_ok
+                }
+                for row in result.all()
+            ]
         
         return candidates
 
@@ -0,0 +1,206 @@
+"""
+Inference batching for the ML services.
+Coalesces concurrent single-text requests into one batched model call.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def select_device() -> str:
+    """
+    Pick the device for the transformer models.
+    
+    Honors MODEL_DEVICE; with "auto", uses CUDA when a GPU is visible
+    (respecting CUDA_VISIBLE_DEVICES) and falls back to CPU.
+    
+    Returns:
+        "cuda" or "cpu"
+    """
+    if settings.ml_device != "auto":
+        return settings.ml_device
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def use_fp16(device: str) -> bool:
+    """Whether to load half-precision weights on the given device."""
+    return device == "cuda" and settings.ml_fp16
+
+
+def _init_inference_worker() -> None:
+    """Cap intra-op threads per worker so workers don't oversubscribe cores."""
+    try:
+        import torch
+        torch.set_num_threads(settings.inference_torch_threads)
+    except ImportError:
+        pass
+
+
+# Dedicated pool for CPU-bound model calls, kept apart from the default
+# executor so slow inference can't starve other to_thread users
+INFERENCE_WORKERS = settings.inference_workers or max(1, (os.cpu_count() or 2) // 2)
+
+inference_executor = ThreadPoolExecutor(
+    max_workers=INFERENCE_WORKERS,
+    thread_name_prefix="inference",
+    initializer=_init_inference_worker
+)
+
+
+async def run_inference(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking model call on the inference executor.
+    
+    Args:
+        fn: Synchronous function to call
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+        
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        inference_executor, functools.partial(fn, *args, **kwargs)
+    )
+
+
+class MicroBatcher:
+    """
+    Collects texts submitted by concurrent requests and runs them through
+    a batch function in a single forward pass.
+
+    A batch is dispatched once `max_batch` items are queued or `max_wait_ms`
+    has elapsed since the first item arrived, whichever comes first. Up to
+    one batch per inference worker runs at a time, so the next batch can
+    fill while earlier ones are still in the model.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[str]], Sequence[Any]],
+        max_batch: int = None,
+        max_wait_ms: float = None
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            batch_fn: Function mapping a list of texts to a list of results
+            max_batch: Maximum number of texts per batch
+            max_wait_ms: Maximum time to wait for a batch to fill
+        """
+        self._batch_fn = batch_fn
+        self.max_batch = settings.inference_max_batch if max_batch is None else max_batch
+        self.max_wait = (
+            settings.inference_max_wait_ms if max_wait_ms is None else max_wait_ms
+        ) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, text: str) -> Any:
+        """
+        Queue a text for the next batch and wait for its result.
+
+        Args:
+            text: Input text
+
+        Returns:
+            The batch function's result for this text
+        """
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the drain task on the current event loop if needed."""
+        if self._loop is loop and self._worker and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(INFERENCE_WORKERS)
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Drain the queue into batches forever."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            items = [await self._queue.get()]
+
+            # Wait for a free inference worker before filling the batch, so
+            # texts queued meanwhile join it instead of the one after
+            await self._slots.acquire()
+            deadline = loop.time() + self.max_wait
+
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Run the batch in the background and go collect the next one
+            task = loop.create_task(self._dispatch(items))
+            self._in_flight.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        """Release the worker slot held by a finished batch."""
+        self._in_flight.discard(task)
+        self._slots.release()
+
+    async def _dispatch(self, items: List[Tuple[str, asyncio.Future]]) -> None:
+        """Run one batch and resolve the waiting futures."""
+        # Sort by length so padding wastes as few tokens as possible
+        items.sort(key=lambda item: len(item[0]))
+        texts = [text for text, _ in items]
+
+        try:
+            results = await run_inference(self._batch_fn, texts)
+        except Exception as exc:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _analyze_batch(texts: List[str]) -> List[dict]:
+    """Batch function for BERT sentiment analysis."""
+    from app.services.sentiment import sentiment_analyzer
+    return sentiment_analyzer.analyze_batch(texts)
+
+
+def _encode_batch(texts: List[str]) -> list:
+    """Batch function for MiniLM embeddings."""
+    from app.services.semantic_search import semantic_search_service
+    return list(semantic_search_service.encode_batch(texts))
+
+
+# Global instances
+sentiment_batcher = MicroBatcher(_analyze_batch)
+embedding_batcher = MicroBatcher(_encode_batch)
@@ -3,19 +3,43 @@ Tiered Knowledge Base Service.
 Manages L1/L2/L3 knowledge retrieval with cascading search.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, text, func, and_
+from sqlalchemy import select, update, func, and_, bindparam, case, Integer
 from sqlalchemy.orm import selectinload
 import numpy as np
 
 from app.models.knowledge import KnowledgeBase, PromotionHistory
-from app.models.ticket import KnowledgeTier
+from app.models.ticket import KnowledgeTier, TIER_VALUES
 from app.services.semantic_search import SemanticSearchService, semantic_search_service
+from app.services.inference import run_inference
 from app.config import get_settings
 
 settings = get_settings()
 
+_kb = KnowledgeBase.__table__
+
+# Folds one usage into the running counters. Right-hand sides see the
+# pre-update row, so usage_count here is the old count.
+RECORD_USAGE = (
+    update(_kb)
+    .where(_kb.c.id == bindparam("kb_id"))
+    .values(
+        usage_count=_kb.c.usage_count + 1,
+        success_rate=(
+            (_kb.c.success_rate * _kb.c.usage_count + bindparam("success", type_=Integer))
+            / (_kb.c.usage_count + 1)
+        ),
+        avg_feedback_score=case(
+            (bindparam("feedback", type_=Integer).is_(None), _kb.c.avg_feedback_score),
+            else_=(
+                (_kb.c.avg_feedback_score * _kb.c.usage_count + bindparam("feedback", type_=Integer))
+                / (_kb.c.usage_count + 1)
+            )
+        )
+    )
+)
+
 
 class KnowledgeBaseService:
     """
@@ -35,7 +59,8 @@ class KnowledgeBaseService:
         query: str,
         start_tier: KnowledgeTier = KnowledgeTier.L1,
         min_score_threshold: float = 0.5,
-        cascade: bool = True
+        cascade: bool = True,
+        query_embedding: Optional[np.ndarray] = None
     ) -> Dict[str, Any]:
         """
         Search knowledge base with tiered cascading.
@@ -49,29 +74,33 @@ class KnowledgeBaseService:
             start_tier: Tier to start searching from
             min_score_threshold: Minimum hybrid score to accept
             cascade: Whether to cascade to higher tiers
+            query_embedding: Precomputed embedding of query, if available
             
         Returns:
             Dictionary with results and search metadata
         """
         tier_order = [KnowledgeTier.L1, KnowledgeTier.L2, KnowledgeTier.L3]
-        start_idx = tier_order.index(start_tier)
+        candidate_tiers = tier_order[tier_order.index(start_tier):]
+        
+        # One query returns every tier's top results; the cascade below
+        # then only decides which tiers' results to keep
+        by_tier = await self._search.search_by_tier(
+            session=session,
+            query=query,
+            tiers=candidate_tiers,
+            top_k=settings.top_k_results,
+            query_embedding=query_embedding
+        )
         
         all_results = []
         searched_tiers = []
         
-        for tier in tier_order[start_idx:]:
-            results = await self._search.hybrid_search(
-                session=session,
-                query=query,
-                tier=tier,
-                top_k=settings.top_k_results
-            )
-            
-            searched_tiers.append(tier.value)
+        for tier in candidate_tiers:
+            searched_tiers.append(TIER_VALUES[tier])
             
             # Filter by threshold
             qualified_results = [
-                r for r in results 
+                r for r in by_tier[TIER_VALUES[tier]]
                 if r["hybrid_score"] >= min_score_threshold
             ]
             
@@ -98,49 +127,71 @@ class KnowledgeBaseService:
     async def get_by_tier(
         self,
         session: AsyncSession,
-        tier: KnowledgeTier,
+        tier: Union[KnowledgeTier, Sequence[KnowledgeTier]],
         category: Optional[str] = None,
         limit: int = 20
     ) -> List[Dict[str, Any]]:
         """
-        Get all knowledge base entries for a specific tier.
+        Get knowledge base entries for one or more tiers.
+        
+        Multiple tiers are fetched in a single query, ranked per tier by
+        usage with a window function.
         
         Args:
             session: Database session
-            tier: Knowledge tier to retrieve
+            tier: Knowledge tier, or list of tiers, to retrieve
             category: Optional category filter
-            limit: Maximum results
+            limit: Maximum results per tier
             
         Returns:
-            List of knowledge base entries
+            List of knowledge base entries, grouped by tier
         """
-        query = select(KnowledgeBase).where(
+        tiers = [tier] if isinstance(tier, KnowledgeTier) else list(tier)
+        
+        ranked = select(
+            KnowledgeBase.id,
+            KnowledgeBase.tier,
+            KnowledgeBase.title,
+            KnowledgeBase.content,
+            KnowledgeBase.keywords,
+            KnowledgeBase.category,
+            KnowledgeBase.usage_count,
+            KnowledgeBase.avg_feedback_score,
+            func.row_number().over(
+                partition_by=KnowledgeBase.tier,
+                order_by=KnowledgeBase.usage_count.desc()
+            ).label("rn")
+        ).where(
             and_(
-                KnowledgeBase.tier == tier,
+                KnowledgeBase.tier.in_(tiers),
                 KnowledgeBase.is_active == True
             )
         )
         
         if category:
-            query = query.where(KnowledgeBase.category == category)
+            ranked = ranked.where(KnowledgeBase.category == category)
         
-        query = query.order_by(KnowledgeBase.usage_count.desc()).limit(limit)
+        ranked = ranked.subquery()
+        query = (
+            select(ranked)
+            .where(ranked.c.rn <= limit)
+            .order_by(ranked.c.tier, ranked.c.rn)
+        )
         
         result = await session.execute(query)
-        entries = result.scalars().all()
         
         return [
             {
-                "id": entry.id,
-                "tier": entry.tier.value,
-                "title": entry.title,
-                "content": entry.content,
-                "keywords": entry.keywords,
-                "category": entry.category,
-                "usage_count": entry.usage_count,
-                "avg_feedback_score": entry.avg_feedback_score
+                "id": row.id,
+                "tier": TIER_VALUES[row.tier],
+                "title": row.title,
+                "content": row.content,
+                "keywords": row.keywords,
+                "category": row.category,
+                "usage_count": row.usage_count,
+                "avg_feedback_score": row.avg_feedback_score
             }
-            for entry in entries
+            for row in result.fetchall()
         ]
     
     async def get_by_id(
@@ -149,26 +200,30 @@ class KnowledgeBaseService:
         kb_id: int
     ) -> Optional[Dict[str, Any]]:
         """Get a single knowledge base entry by ID."""
+        # Explicit columns: skips the embedding and ORM hydration
         result = await session.execute(
-            select(KnowledgeBase).where(KnowledgeBase.id == kb_id)
+            select(
+                KnowledgeBase.id,
+                KnowledgeBase.tier,
+                KnowledgeBase.title,
+                KnowledgeBase.content,
+                KnowledgeBase.keywords,
+                KnowledgeBase.category,
+                KnowledgeBase.usage_count,
+                KnowledgeBase.success_rate,
+                KnowledgeBase.avg_feedback_score,
+                KnowledgeBase.created_at
+            ).where(KnowledgeBase.id == kb_id)
         )
-        entry = result.scalar_one_or_none()
+        row = result.mappings().one_or_none()
         
-        if not entry:
+        if not row:
             return None
         
-        return {
-            "id": entry.id,
-            "tier": entry.tier.value,
-            "title": entry.title,
-            "content": entry.content,
-            "keywords": entry.keywords,
-            "category": entry.category,
-            "usage_count": entry.usage_count,
-            "success_rate": entry.success_rate,
-            "avg_feedback_score": entry.avg_feedback_score,
-            "created_at": entry.created_at.isoformat() if entry.created_at else None
-        }
+        entry = dict(row)
+        entry["tier"] = TIER_VALUES[row["tier"]]
+        entry["created_at"] = row["created_at"].isoformat() if row["created_at"] else None
+        return entry
     
     async def create_entry(
         self,
@@ -203,7 +258,7 @@ class KnowledgeBaseService:
             content=content,
             keywords=keywords or [],
             category=category,
-            embedding=embedding.tolist()
+            embedding=embedding
         )
         
         session.add(entry)
@@ -223,49 +278,49 @@ class KnowledgeBaseService:
         kb_id: int,
         feedback_score: Optional[int] = None,
         was_successful: bool = True
-    ) -> None:
+    ) -> Optional[int]:
         """
         Record usage of a knowledge base entry.
-        Updates usage count, success rate, and feedback score.
+        Updates usage count, success rate, and feedback score in a single
+        UPDATE; the running averages are computed from the row's current
+        values, so concurrent resolutions can't lose updates.
         
         Args:
             session: Database session
             kb_id: Knowledge base entry ID
             feedback_score: Optional user feedback (1-5)
             was_successful: Whether resolution was successful
+            
+        Returns:
+            New usage count, or None if the entry doesn't exist
         """
-        # Get current entry
         result = await session.execute(
-            select(KnowledgeBase).where(KnowledgeBase.id == kb_id)
+            RECORD_USAGE.returning(_kb.c.usage_count),
+            {"kb_id": kb_id, "success": int(was_successful), "feedback": feedback_score or None}
         )
-        entry = result.scalar_one_or_none()
+        return result.scalar_one_or_none()
+    
+    async def record_usage_many(
+        self,
+        session: AsyncSession,
+        usages: Sequence[Tuple[int, Optional[int], bool]]
+    ) -> None:
+        """
+        Record a burst of usages in one executemany UPDATE.
         
-        if not entry:
+        Args:
+            session: Database session
+            usages: (kb_id, feedback_score, was_successful) tuples
+        """
+        if not usages:
             return
         
-        # Update usage count
-        new_usage_count = entry.usage_count + 1
-        
-        # Update success rate
-        current_successes = entry.success_rate * entry.usage_count
-        new_successes = current_successes + (1 if was_successful else 0)
-        new_success_rate = new_successes / new_usage_count
-        
-        # Update average feedback score
-        if feedback_score:
-            current_feedback_sum = entry.avg_feedback_score * entry.usage_count
-            new_feedback_avg = (current_feedback_sum + feedback_score) / new_usage_count
-        else:
-            new_feedback_avg = entry.avg_feedback_score
-        
         await session.execute(
-            update(KnowledgeBase)
-            .where(KnowledgeBase.id == kb_id)
-            .values(
-                usage_count=new_usage_count,
-                success_rate=new_success_rate,
-                avg_feedback_score=new_feedback_avg
-            )
+            RECORD_USAGE,
+            [
+                {"kb_id": kb_id, "success": int(was_successful), "feedback": feedback_score or None}
+                for kb_id, feedback_score, was_successful in usages
+            ]
         )
     
     async def get_categories(
@@ -274,66 +329,86 @@ class KnowledgeBaseService:
         tier: Optional[KnowledgeTier] = None
     ) -> List[Dict[str, Any]]:
         """Get list of categories with entry counts."""
-        query = """
-            SELECT 
-                category,
-                tier,
-                COUNT(*) as count,
-                AVG(avg_feedback_score) as avg_score
-            FROM knowledge_base
-            WHERE is_active = true
-        """
+        count = func.count().label("count")
+        query = (
+            select(
+                KnowledgeBase.category,
+                KnowledgeBase.tier,
+                count,
+                func.avg(KnowledgeBase.avg_feedback_score).label("avg_score")
+            )
+            .where(KnowledgeBase.is_active == True)
+            .group_by(KnowledgeBase.category, KnowledgeBase.tier)
+            .order_by(count.desc())
+        )
         
-        params = {}
         if tier:
-            query += " AND tier = :tier"
-            params["tier"] = tier.value
-        
-        query += " GROUP BY category, tier ORDER BY count DESC"
+            query = query.where(KnowledgeBase.tier == tier)
         
-        result = await session.execute(text(query), params)
-        rows = result.fetchall()
+        result = await session.execute(query)
         
         return [
             {
                 "category": row.category,
-                "tier": row.tier,
+                "tier": TIER_VALUES[row.tier],
                 "count": row.count,
                 "avg_score": float(row.avg_score) if row.avg_score else 0.0
             }
-            for row in rows
+            for row in result
         ]
     
     async def update_embeddings(
         self,
         session: AsyncSession,
-        batch_size: int = 50
+        batch_size: int = 50,
+        all_entries: bool = False
     ) -> int:
         """
         Update embeddings for entries that don't have them.
         
+        Rows are read through a server-side cursor, one batch at a time,
+        so a full re-embed never holds more than one batch of text.
+        
+        Args:
+            session: Database session
+            batch_size: Entries encoded and written per round
+            all_entries: Process every entry missing an embedding instead
+                of just the first batch
+            
         Returns:
             Number of entries updated
         """
         # Find entries without embeddings
-        result = await session.execute(
-            select(KnowledgeBase)
+        # The database concatenates the text, so each row arrives as the
+        # single string handed to the tokenizer
+        query = (
+            select(
+                KnowledgeBase.id,
+                (KnowledgeBase.title + " " + KnowledgeBase.content).label("combined")
+            )
             .where(KnowledgeBase.embedding.is_(None))
-            .limit(batch_size)
+            .execution_options(yield_per=batch_size)
         )
-        entries = result.scalars().all()
+        if not all_entries:
+            query = query.limit(batch_size)
+        
+        result = await session.stream(query)
         
         updated_count = 0
-        for entry in entries:
-            combined_text = f"{entry.title} {entry.content}"
-            embedding = self._search.encode(combined_text)
+        async for entries in result.partitions():
+            # One batched forward pass per batch of entries
+            texts = [entry.combined for entry in entries]
+            embeddings = await run_inference(self._search.encode_batch, texts)
             
+            # Bulk UPDATE by primary key (executemany)
             await session.execute(
-                update(KnowledgeBase)
-                .where(KnowledgeBase.id == entry.id)
-                .values(embedding=embedding.tolist())
+                update(KnowledgeBase),
+                [
+                    {"id": entry.id, "embedding": embedding}
+                    for entry, embedding in zip(entries, embeddings)
+                ]
             )
-            updated_count += 1
+            updated_count += len(entries)
         
         return updated_count
 
@@ -0,0 +1,202 @@
+"""
+ONNX Runtime backends for the transformer services.
+Loads INT8-quantized exports produced by scripts/export_onnx.py.
+
+Requires the optional `optimum[onnxruntime]` dependency; it is only imported
+when MODEL_BACKEND=onnx.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Union
+import numpy as np
+
+from app.config import get_settings
+
+settings = get_settings()
+
+MINILM_SUBDIR = "minilm"
+SENTIMENT_SUBDIR = "sentiment"
+
+
+def _model_dir(subdir: str) -> Path:
+    """Resolve an exported model directory, failing early if missing."""
+    path = Path(settings.onnx_model_dir) / subdir
+    if not path.is_dir():
+        raise FileNotFoundError(
+            f"ONNX model not found at {path}. Run scripts/export_onnx.py first."
+        )
+    return path
+
+
+def _session_options():
+    """
+    ONNX Runtime session options shared by both models.
+    
+    Enables all graph optimizations and caps intra-op threads at
+    INFERENCE_TORCH_THREADS, matching the per-worker limit of the
+    inference executor so concurrent workers don't oversubscribe cores.
+    BERT graphs are a single chain of ops, so they run sequentially with
+    no inter-op thread pool.
+    """
+    import onnxruntime as ort
+    
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = settings.inference_torch_threads
+    options.inter_op_num_threads = 1
+    return options
+
+
+def _mean_pool_l2(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Masked mean pooling followed by L2 normalization.
+    
+    The masked sum is a batched (1, seq) @ (seq, 384) matmul, so BLAS
+    reads the hidden states once and no (batch, seq, 384) masked copy is
+    materialized; the divisions then happen in place on the small
+    (batch, 384) result.
+    
+    Args:
+        hidden: Token embeddings of shape (batch, seq, 384)
+        attention_mask: Mask of shape (batch, seq), 1 for real tokens
+        
+    Returns:
+        Unit-length sentence embeddings of shape (batch, 384)
+    """
+    mask = attention_mask.astype(np.float32)
+    pooled = np.matmul(mask[:, None, :], hidden)[:, 0, :]
+    pooled /= np.clip(mask.sum(axis=1, keepdims=True), 1e-9, None)
+    pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled
+
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode backed by ONNX Runtime.
+    Applies the same mean pooling and L2 normalization as all-MiniLM-L6-v2.
+    """
+
+    def __init__(self):
+        """Load the quantized MiniLM export and its tokenizer."""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        path = _model_dir(MINILM_SUBDIR)
+        self._tokenizer = AutoTokenizer.from_pretrained(path)
+        self._model = ORTModelForFeatureExtraction.from_pretrained(
+            path,
+            file_name=settings.onnx_file_name,
+            provider="CPUExecutionProvider",
+            session_options=_session_options()
+        )
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        batch_size: int = 32
+    ) -> np.ndarray:
+        """
+        Encode one text or a list of texts.
+
+        Args:
+            sentences: Input text or texts
+            convert_to_numpy: Accepted for API compatibility; always numpy
+            show_progress_bar: Accepted for API compatibility; ignored
+            batch_size: Number of texts per forward pass
+
+        Returns:
+            numpy array of shape (384,) or (n, 384)
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self._tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=256,
+                return_tensors="np"
+            )
+            hidden = self._model(**inputs).last_hidden_state
+            hidden = np.asarray(hidden, dtype=np.float32)
+            chunks.append(_mean_pool_l2(hidden, inputs["attention_mask"]))
+
+        embeddings = np.concatenate(chunks) if chunks else np.zeros((0, 384), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    """Row-wise softmax, computed in place on a float32 copy of the logits."""
+    probs = np.array(logits, dtype=np.float32)
+    probs -= probs.max(axis=1, keepdims=True)
+    np.exp(probs, out=probs)
+    probs /= probs.sum(axis=1, keepdims=True)
+    return probs
+
+
+class OnnxSentimentClassifier:
+    """
+    Drop-in replacement for the transformers sentiment pipeline backed by
+    ONNX Runtime.
+
+    Runs the quantized BERT export on a plain onnxruntime InferenceSession:
+    the tokenizer emits numpy arrays, the session returns numpy logits and
+    the softmax is done in numpy, so this path never imports torch or
+    optimum and skips the pipeline's per-item pre/post-processing.
+    """
+
+    def __init__(self):
+        """Load the quantized BERT sentiment export and its tokenizer."""
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        path = _model_dir(SENTIMENT_SUBDIR)
+        self._tokenizer = AutoTokenizer.from_pretrained(path)
+        self._session = ort.InferenceSession(
+            str(path / settings.onnx_file_name),
+            sess_options=_session_options(),
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = [node.name for node in self._session.get_inputs()]
+        self._labels = AutoConfig.from_pretrained(path).id2label
+
+    def __call__(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify one text or a list of texts.
+
+        Args:
+            texts: Input text or texts
+            batch_size: Number of texts padded into each forward pass
+
+        Returns:
+            One {"label", "score"} dict per text, like the pipeline
+        """
+        texts = [texts] if isinstance(texts, str) else list(texts)
+
+        results = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self._tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="np"
+            )
+            feed = {name: inputs[name].astype(np.int64) for name in self._input_names}
+            probs = _softmax(self._session.run(None, feed)[0])
+            best = probs.argmax(axis=1)
+            results.extend(
+                {"label": self._labels[int(index)], "score": float(probs[row, index])}
+                for row, index in enumerate(best)
+            )
+
+        return results
@@ -0,0 +1,172 @@
+"""
+Semantic Response Cache.
+Serves repeated or paraphrased queries from memory by comparing query embeddings.
+"""
+
+import time
+import numpy as np
+from typing import Any, Dict, Hashable, List, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class _Partition:
+    """
+    Ring buffer of normalized query embeddings for one namespace, stored
+    as a contiguous matrix so a lookup is a single matrix-vector product.
+    Starts small and doubles up to the namespace's entry limit.
+    """
+
+    __slots__ = ("vectors", "expires", "payloads", "next_slot")
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.expires = np.full(capacity, -np.inf)  # -inf marks an empty slot
+        self.payloads: List[Any] = [None] * capacity
+        self.next_slot = 0
+
+    def grow(self, capacity: int) -> None:
+        """Enlarge the buffer, keeping existing slots in place."""
+        extra = capacity - len(self.payloads)
+        self.vectors = np.vstack(
+            [self.vectors, np.zeros((extra, self.vectors.shape[1]), dtype=np.float32)]
+        )
+        self.expires = np.concatenate([self.expires, np.full(extra, -np.inf)])
+        self.payloads.extend([None] * extra)
+
+
+class SemanticCache:
+    """
+    In-process cache keyed by query embedding.
+
+    A lookup hits when a stored, unexpired entry in the same namespace has
+    cosine similarity >= threshold with the incoming query embedding.
+    Namespaces keep results for different search parameters apart.
+    """
+
+    def __init__(
+        self,
+        threshold: float = None,
+        ttl_seconds: int = None,
+        max_entries: int = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Default lifetime of stored entries
+            max_entries: Maximum entries kept per namespace
+        """
+        self.threshold = threshold or settings.semantic_cache_threshold
+        self.ttl_seconds = ttl_seconds or settings.semantic_cache_ttl
+        self.max_entries = max_entries or settings.semantic_cache_max_entries
+        self._partitions: Dict[Hashable, _Partition] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """L2-normalize an embedding so a dot product is cosine similarity."""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(
+        self,
+        embedding: np.ndarray,
+        namespace: Hashable = None,
+        threshold: float = None
+    ) -> Optional[Any]:
+        """
+        Find a cached payload for a semantically similar query.
+
+        Args:
+            embedding: Query embedding
+            namespace: Cache partition (e.g. search parameters)
+            threshold: Optional override of the similarity threshold
+
+        Returns:
+            Cached payload, or None on a miss
+        """
+        partition = self._partitions.get(namespace)
+        if partition is None:
+            self.misses += 1
+            return None
+
+        similarities = partition.vectors @ self._normalize(embedding)
+        # Expired and empty slots can never win
+        similarities[partition.expires <= time.monotonic()] = -np.inf
+        best = int(np.argmax(similarities))
+
+        if similarities[best] >= (threshold or self.threshold):
+            self.hits += 1
+            return partition.payloads[best]
+
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        embedding: np.ndarray,
+        payload: Any,
+        namespace: Hashable = None,
+        ttl: int = None
+    ) -> None:
+        """
+        Store a payload under a query embedding.
+
+        Args:
+            embedding: Query embedding
+            payload: Value returned on later hits
+            namespace: Cache partition (e.g. search parameters)
+            ttl: Optional override of the entry lifetime in seconds
+        """
+        vector = self._normalize(embedding)
+        partition = self._partitions.get(namespace)
+        if partition is None:
+            partition = _Partition(vector.shape[0], min(16, self.max_entries))
+            self._partitions[namespace] = partition
+
+        slot = partition.next_slot
+        if slot == len(partition.payloads):
+            if slot < self.max_entries:
+                partition.grow(min(slot * 2, self.max_entries))
+            else:
+                slot = 0  # Full: overwrite the oldest entry
+
+        partition.vectors[slot] = vector
+        partition.expires[slot] = time.monotonic() + (ttl or self.ttl_seconds)
+        partition.payloads[slot] = payload
+        partition.next_slot = slot + 1
+
+    def clear(self) -> None:
+        """Drop all cached entries (e.g. after knowledge base changes)."""
+        self._partitions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for tuning the threshold."""
+        total = self.hits + self.misses
+        now = time.monotonic()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": sum(
+                int(np.count_nonzero(partition.expires > now))
+                for partition in self._partitions.values()
+            ),
+            "threshold": self.threshold
+        }
+
+
+# Global instances
+search_cache = SemanticCache()
+
+# Sentiment of near-duplicate ticket text, so paraphrases skip BERT
+sentiment_cache = SemanticCache(
+    threshold=settings.sentiment_cache_threshold,
+    max_entries=settings.sentiment_cache_max_entries
+)
@@ -3,19 +3,64 @@ Semantic Search Service using Sentence Transformers MiniLM.
 Provides hybrid search combining semantic similarity and keyword matching.
 """
 
+import threading
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text, func
-from sklearn.metrics.pairwise import cosine_similarity
+from sqlalchemy import select, text, func, bindparam
+from pgvector.sqlalchemy import Vector
 
 from app.config import get_settings
+from app.services.inference import select_device, use_fp16
 from app.models.knowledge import KnowledgeBase
 from app.models.ticket import KnowledgeTier
 
 settings = get_settings()
 
+# Binds numpy embeddings straight to pgvector's text format
+EMBEDDING_PARAM = bindparam("query_embedding", type_=Vector(384))
+
+# Returned for empty text; shared, so it is made read-only. float32 like
+# the model output (pgvector stores float4)
+ZERO_EMBEDDING = np.zeros(384, dtype=np.float32)
+ZERO_EMBEDDING.flags.writeable = False
+
+
+def _candidates_sql(filters: str, order_by: str, per_tier: bool) -> str:
+    """
+    Build a query for the ids of the best :candidates rows by order_by.
+    
+    Args:
+        filters: WHERE conditions on knowledge_base kb
+        order_by: Ranking expression, best first
+        per_tier: Take :candidates rows from each of :tiers rather than
+            overall, so a tier whose entries all rank below another
+            tier's still gets a full candidate pool
+        
+    Returns:
+        SQL selecting a single id column
+    """
+    if not per_tier:
+        return f"""
+                SELECT kb.id
+                FROM knowledge_base kb
+                WHERE {filters}
+                ORDER BY {order_by}
+                LIMIT :candidates
+        """
+    return f"""
+                SELECT c.id
+                FROM unnest(CAST(:tiers AS knowledge_tier[])) AS wanted(tier)
+                CROSS JOIN LATERAL (
+                    SELECT kb.id
+                    FROM knowledge_base kb
+                    WHERE {filters}
+                        AND kb.tier = wanted.tier
+                    ORDER BY {order_by}
+                    LIMIT :candidates
+                ) c
+        """
+
 
 class SemanticSearchService:
     """
@@ -25,6 +70,7 @@ class SemanticSearchService:
     
     _instance = None
     _model = None
+    _load_lock = threading.Lock()
     
     def __new__(cls):
         """Singleton pattern to avoid loading model multiple times."""
@@ -34,14 +80,30 @@ class SemanticSearchService:
         return cls._instance
     
     def __init__(self):
-        """Initialize the sentence transformer model."""
+        """Create the service; the model is loaded on first use or by load()."""
+    
+    def load(self) -> None:
+        """Load the sentence transformer model (idempotent, thread-safe)."""
         if self._initialized:
             return
         
-        print(f"Loading MiniLM model: {settings.minilm_model}")
-        self._model = SentenceTransformer(settings.minilm_model)
-        self._initialized = True
-        print("MiniLM model loaded successfully!")
+        with self._load_lock:
+            if self._initialized:
+                return
+            
+            if settings.ml_backend == "onnx":
+                from app.services.onnx_backend import OnnxSentenceEncoder
+                print(f"Loading MiniLM model (ONNX): {settings.onnx_model_dir}")
+                self._model = OnnxSentenceEncoder()
+            else:
+                from sentence_transformers import SentenceTransformer
+                device = select_device()
+                print(f"Loading MiniLM model: {settings.minilm_model} ({device})")
+                self._model = SentenceTransformer(settings.minilm_model, device=device)
+                if use_fp16(device):
+                    self._model.half()
+            self._initialized = True
+            print("MiniLM model loaded successfully!")
     
     def encode(self, text: str) -> np.ndarray:
         """
@@ -51,20 +113,23 @@ class SemanticSearchService:
             text: Input text to encode
             
         Returns:
-            numpy array of shape (384,)
+            numpy float32 array of shape (384,); empty text gets the shared
+            read-only ZERO_EMBEDDING
         """
-        if not text or not text.strip():
-            return np.zeros(384)
+        if not text or text.isspace():
+            return ZERO_EMBEDDING
         
+        self.load()
         embedding = self._model.encode(text, convert_to_numpy=True)
         return embedding
     
-    def encode_batch(self, texts: List[str]) -> np.ndarray:
+    def encode_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
         """
         Encode multiple texts into embeddings.
         
         Args:
             texts: List of input texts
+            batch_size: Number of texts per forward pass
             
         Returns:
             numpy array of shape (n, 384)
@@ -72,7 +137,13 @@ class SemanticSearchService:
         if not texts:
             return np.array([])
         
-        embeddings = self._model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        self.load()
+        embeddings = self._model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
         return embeddings
     
     def similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
@@ -86,21 +157,25 @@ class SemanticSearchService:
         Returns:
             Similarity score between 0 and 1
         """
-        if embedding1.ndim == 1:
-            embedding1 = embedding1.reshape(1, -1)
-        if embedding2.ndim == 1:
-            embedding2 = embedding2.reshape(1, -1)
+        a = np.asarray(embedding1, dtype=np.float32).ravel()
+        b = np.asarray(embedding2, dtype=np.float32).ravel()
         
-        return float(cosine_similarity(embedding1, embedding2)[0][0])
+        # Model outputs are already unit-length, so the norms are ~1; they
+        # are kept so arbitrary vectors (and all-zero ones) stay well-defined
+        denominator = np.linalg.norm(a) * np.linalg.norm(b)
+        if not denominator:
+            return 0.0
+        return float(a @ b / denominator)
     
     async def hybrid_search(
         self,
         session: AsyncSession,
         query: str,
-        tier: Optional[KnowledgeTier] = None,
+        tier: Union[KnowledgeTier, Sequence[KnowledgeTier], None] = None,
         top_k: int = None,
         semantic_weight: float = None,
-        keyword_weight: float = None
+        keyword_weight: float = None,
+        query_embedding: Optional[np.ndarray] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform hybrid search combining semantic similarity and keyword matching.
@@ -108,10 +183,11 @@ class SemanticSearchService:
         Args:
             session: Database session
             query: Search query text
-            tier: Optional tier filter (L1, L2, L3)
-            top_k: Number of results to return
+            tier: Optional tier filter (L1, L2, L3), or a list of tiers
+            top_k: Number of results to return (per tier for a list of tiers)
             semantic_weight: Weight for semantic similarity (0-1)
             keyword_weight: Weight for keyword matching (0-1)
+            query_embedding: Precomputed embedding of query, if available
             
         Returns:
             List of knowledge base entries with scores
@@ -120,59 +196,125 @@ class SemanticSearchService:
         semantic_weight = semantic_weight or settings.semantic_weight
         keyword_weight = keyword_weight or settings.keyword_weight
         
-        # Generate query embedding
-        query_embedding = self.encode(query)
-        query_embedding_list = query_embedding.tolist()
-        
-        # Build the hybrid search query
-        # Semantic similarity using pgvector cosine distance
-        # Keyword search using PostgreSQL full-text search
+        # Generate query embedding unless the caller already has one
+        if query_embedding is None:
+            query_embedding = self.encode(query)
         
-        base_query = """
-            SELECT 
-                kb.id,
-                kb.tier,
-                kb.title,
-                kb.content,
-                kb.keywords,
-                kb.category,
-                kb.usage_count,
-                kb.avg_feedback_score,
-                1 - (kb.embedding <=> :query_embedding::vector) as semantic_score,
-                ts_rank(
-                    to_tsvector('english', kb.title || ' ' || kb.content),
-                    plainto_tsquery('english', :query_text)
-                ) as keyword_score
-            FROM knowledge_base kb
-            WHERE kb.is_active = true
+        # Two-stage search: nearest neighbours by raw distance (from the
+        # in-memory index, or straight off the HNSW index), best full-text
+        # matches off the GIN index on search_tsv; only the union of both
+        # candidate sets is scored
+        filters = """
+                kb.is_active = true
                 AND kb.embedding IS NOT NULL
         """
         
         params = {
-            "query_embedding": str(query_embedding_list),
+            "query_embedding": query_embedding,
             "query_text": query
         }
         
-        if tier:
-            base_query += " AND kb.tier = :tier"
+        tiers = None
+        if isinstance(tier, KnowledgeTier):
+            filters += " AND kb.tier = :tier"
             params["tier"] = tier.value
+        elif tier:
+            tiers = list(tier)
+            filters += " AND kb.tier = ANY(CAST(:tiers AS knowledge_tier[]))"
+            params["tiers"] = [t.value for t in tiers]
         
-        # Wrap with hybrid scoring
-        hybrid_query = f"""
+        hybrid_score = "(semantic_score * :semantic_weight + keyword_score * :keyword_weight)"
+        if tiers:
+            # Best top_k of each tier, from one scan instead of one per tier
+            ranking = f"""
+            SELECT * FROM (
+                SELECT *,
+                    {hybrid_score} as hybrid_score,
+                    row_number() OVER (PARTITION BY tier ORDER BY {hybrid_score} DESC) as tier_rank
+                FROM scored
+            ) ranked
+            WHERE tier_rank <= :top_k
+            ORDER BY hybrid_score DESC
+            """
+        else:
+            ranking = f"""
             SELECT *,
-                (semantic_score * :semantic_weight + keyword_score * :keyword_weight) as hybrid_score
-            FROM ({base_query}) subq
+                {hybrid_score} as hybrid_score
+            FROM scored
             ORDER BY hybrid_score DESC
             LIMIT :top_k
+            """
+        
+        # Candidate pools are per tier for a list of tiers
+        candidates = max(settings.ann_candidates, top_k)
+        
+        if settings.kb_memory_index:
+            # Nearest neighbours from the in-process matrix; the database
+            # only re-checks those ids against the filters
+            from app.services.vector_index import kb_vector_index
+            
+            if tiers:
+                sem_ids = []
+                for t in tiers:
+                    sem_ids += await kb_vector_index.nearest(
+                        session, query_embedding, candidates, tiers=[t]
+                    )
+            else:
+                sem_ids = await kb_vector_index.nearest(
+                    session, query_embedding, candidates, tiers=[tier] if tier else None
+                )
+            params["sem_ids"] = sem_ids
+            sem_query = f"""
+                SELECT kb.id
+                FROM knowledge_base kb
+                WHERE kb.id = ANY(CAST(:sem_ids AS integer[]))
+                    AND {filters}
+            """
+        else:
+            sem_query = _candidates_sql(
+                filters,
+                "kb.embedding <=> CAST(:query_embedding AS vector)",
+                per_tier=bool(tiers)
+            )
+        
+        kw_query = _candidates_sql(
+            filters + " AND kb.search_tsv @@ plainto_tsquery('english', :query_text)",
+            "ts_rank(kb.search_tsv, plainto_tsquery('english', :query_text)) DESC",
+            per_tier=bool(tiers)
+        )
+        
+        hybrid_query = f"""
+            WITH sem AS ({sem_query}),
+            kw AS ({kw_query}),
+            scored AS (
+                SELECT 
+                    kb.id,
+                    kb.tier,
+                    kb.title,
+                    kb.content,
+                    kb.keywords,
+                    kb.category,
+                    kb.usage_count,
+                    kb.avg_feedback_score,
+                    1 - (kb.embedding <=> CAST(:query_embedding AS vector)) as semantic_score,
+                    ts_rank(kb.search_tsv, plainto_tsquery('english', :query_text)) as keyword_score
+                FROM knowledge_base kb
+                JOIN (SELECT id FROM sem UNION SELECT id FROM kw) candidates
+                    ON candidates.id = kb.id
+            )
+            {ranking}
         """
         
         params.update({
+            "candidates": candidates,
             "semantic_weight": semantic_weight,
             "keyword_weight": keyword_weight,
             "top_k": top_k
         })
         
-        result = await session.execute(text(hybrid_query), params)
+        result = await session.execute(
+            text(hybrid_query).bindparams(EMBEDDING_PARAM), params
+        )
         rows = result.fetchall()
         
         return [
@@ -197,7 +339,8 @@ class SemanticSearchService:
         session: AsyncSession,
         query: str,
         tiers: List[KnowledgeTier],
-        top_k: int = None
+        top_k: int = None,
+        query_embedding: Optional[np.ndarray] = None
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Search across multiple tiers and return results grouped by tier.
@@ -207,19 +350,28 @@ class SemanticSearchService:
             query: Search query
             tiers: List of tiers to search
             top_k: Results per tier
+            query_embedding: Precomputed embedding of query, if available
             
         Returns:
             Dictionary with tier names as keys and results as values
         """
-        results = {}
-        for tier in tiers:
-            tier_results = await self.hybrid_search(
-                session=session,
-                query=query,
-                tier=tier,
-                top_k=top_k
-            )
-            results[tier.value] = tier_results
+        if not tiers:
+            return {}
+        
+        if query_embedding is None:
+            query_embedding = self.encode(query)
+        
+        rows = await self.hybrid_search(
+            session=session,
+            query=query,
+            tier=tiers,
+            top_k=top_k,
+            query_embedding=query_embedding
+        )
+        
+        results = {tier.value: [] for tier in tiers}
+        for row in rows:
+            results[row["tier"]].append(row)
         
         return results
     
@@ -240,6 +392,7 @@ class SemanticSearchService:
         Returns:
             List of similar tickets with similarity scores
         """
+        # Order by the raw distance so the HNSW index drives the scan
         query = """
             SELECT 
                 t.id,
@@ -249,19 +402,19 @@ class SemanticSearchService:
                 t.category,
                 r.solution,
                 r.feedback_score,
-                1 - (te.embedding <=> :query_embedding::vector) as similarity
-            FROM tickets t
-            JOIN ticket_embeddings te ON t.id = te.ticket_id
+                1 - (te.embedding <=> CAST(:query_embedding AS vector)) as similarity
+            FROM ticket_embeddings te
+            JOIN tickets t ON t.id = te.ticket_id
             LEFT JOIN resolutions r ON t.id = r.ticket_id
             WHERE t.status IN ('resolved', 'closed')
-            ORDER BY similarity DESC
+            ORDER BY te.embedding <=> CAST(:query_embedding AS vector)
             LIMIT :limit
         """
         
         result = await session.execute(
-            text(query),
+            text(query).bindparams(EMBEDDING_PARAM),
             {
-                "query_embedding": str(query_embedding.tolist()),
+                "query_embedding": query_embedding,
                 "limit": limit
             }
         )
@@ -281,6 +434,81 @@ class SemanticSearchService:
             for row in rows
         ]
 
+    
+    async def find_similar_to_ticket(
+        self,
+        session: AsyncSession,
+        ticket_id: int,
+        limit: int = 5
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find past tickets similar to a stored ticket, entirely in SQL.
+        
+        The ticket's stored embedding is used as the query vector directly,
+        so it never leaves the database.
+        
+        Args:
+            session: Database session
+            ticket_id: Ticket whose embedding is the query
+            limit: Number of results
+            
+        Returns:
+            List of similar tickets with similarity scores, or None if the
+            ticket has no stored embedding
+        """
+        query = """
+            WITH q AS (
+                SELECT embedding FROM ticket_embeddings
+                WHERE ticket_id = :ticket_id
+                LIMIT 1
+            )
+            SELECT s.*
+            FROM q
+            LEFT JOIN LATERAL (
+                SELECT 
+                    t.id,
+                    t.title,
+                    t.description,
+                    t.status,
+                    t.category,
+                    r.solution,
+                    r.feedback_score,
+                    1 - (te.embedding <=> q.embedding) as similarity
+                FROM ticket_embeddings te
+                JOIN tickets t ON t.id = te.ticket_id
+                LEFT JOIN resolutions r ON t.id = r.ticket_id
+                WHERE t.status IN ('resolved', 'closed')
+                    AND te.ticket_id <> :ticket_id
+                ORDER BY te.embedding <=> q.embedding
+                LIMIT :limit
+            ) s ON true
+        """
+        
+        result = await session.execute(
+            text(query),
+            {"ticket_id": ticket_id, "limit": limit}
+        )
+        rows = result.fetchall()
+        
+        # No row at all means the ticket has no embedding; a single
+        # all-NULL row means it has one but nothing matched
+        if not rows:
+            return None
+        
+        return [
+            {
+                "id": row.id,
+                "title": row.title,
+                "description": row.description,
+                "status": row.status,
+                "category": row.category,
+                "solution": row.solution,
+                "feedback_score": row.feedback_score,
+                "similarity": float(row.similarity) if row.similarity else 0.0
+            }
+            for row in rows
+            if row.id is not None
+        ]
 
 # Global instance
 semantic_search_service = SemanticSearchService()
@@ -3,14 +3,38 @@ BERT Sentiment Analysis Service.
 Uses a pre-trained BERT model for multilingual sentiment classification.
 """
 
-from typing import Dict, Any, Tuple, List
-from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
-import torch
+import bisect
+import hashlib
+import threading
+from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Tuple, List, Sequence
+
+import numpy as np
 
 from app.config import get_settings
+from app.services.inference import select_device, use_fp16
 
 settings = get_settings()
 
+# Shared, read-only result for empty input
+EMPTY_TEXT_SENTIMENT = MappingProxyType({
+    "label": "neutral",
+    "score": 0.0,
+    "confidence": 0.0,
+    "raw_label": None
+})
+
+
+class SentimentLabel(str, Enum):
+    """Sentiment category returned by SentimentAnalyzer.classify."""
+    VERY_NEGATIVE = "very_negative"
+    NEGATIVE = "negative"
+    NEUTRAL = "neutral"
+    POSITIVE = "positive"
+    VERY_POSITIVE = "very_positive"
+
 
 class SentimentAnalyzer:
     """
@@ -20,34 +44,54 @@ class SentimentAnalyzer:
     
     _instance = None
     _pipeline = None
+    _load_lock = threading.Lock()
     
     def __new__(cls):
         """Singleton pattern to avoid loading model multiple times."""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialized = False
+            # Per-instance memo for classify(), keyed on a text digest only
+            cls._instance._classify_pending = threading.local()
+            cls._instance._classify_cached = lru_cache(maxsize=cls._LABEL_CACHE_SIZE)(
+                cls._instance._classify_digest
+            )
         return cls._instance
     
     def __init__(self):
-        """Initialize the BERT sentiment pipeline."""
+        """Create the analyzer; the model is loaded on first use or by load()."""
+    
+    def load(self) -> None:
+        """Load the BERT sentiment pipeline (idempotent, thread-safe)."""
         if self._initialized:
             return
         
-        print(f"Loading BERT sentiment model: {settings.bert_sentiment_model}")
-        
-        # Use GPU if available
-        device = 0 if torch.cuda.is_available() else -1
-        
-        self._pipeline = pipeline(
-            "sentiment-analysis",
-            model=settings.bert_sentiment_model,
-            device=device,
-            truncation=True,
-            max_length=512
-        )
-        
-        self._initialized = True
-        print("BERT sentiment model loaded successfully!")
+        with self._load_lock:
+            if self._initialized:
+                return
+            
+            if settings.ml_backend == "onnx":
+                from app.services.onnx_backend import OnnxSentimentClassifier
+                print(f"Loading BERT sentiment model (ONNX): {settings.onnx_model_dir}")
+                self._pipeline = OnnxSentimentClassifier()
+            else:
+                import torch
+                from transformers import pipeline
+                
+                device = select_device()
+                print(f"Loading BERT sentiment model: {settings.bert_sentiment_model} ({device})")
+                
+                self._pipeline = pipeline(
+                    "sentiment-analysis",
+                    model=settings.bert_sentiment_model,
+                    device=device,
+                    torch_dtype=torch.float16 if use_fp16(device) else None,
+                    truncation=True,
+                    max_length=512
+                )
+            
+            self._initialized = True
+            print("BERT sentiment model loaded successfully!")
     
     # Mapping from star ratings to sentiment labels
     SENTIMENT_LABELS = {
@@ -67,7 +111,22 @@ class SentimentAnalyzer:
         "very_positive": 1.0
     }
     
-    def analyze(self, text: str) -> Dict[str, Any]:
+    # Raw model label -> (label, score) in a single lookup (filled in below
+    # the class, since class-scope comprehensions can't see class attributes)
+    _RAW_LABEL_LUT: Dict[str, Tuple[str, float]] = {}
+    _NEUTRAL = ("neutral", 0.0)
+    
+    # Upper (inclusive) score bound of each category but the last
+    _CATEGORY_BOUNDS = (-0.75, -0.25, 0.25, 0.75)
+    _CATEGORY_LABELS = ("very_negative", "negative", "neutral", "positive", "very_positive")
+    
+    # analyze_batch length buckets in characters (roughly 32/64/128 tokens)
+    _LENGTH_BUCKETS = (128, 256, 512)
+    
+    # Size of the digest -> label memo used by classify()
+    _LABEL_CACHE_SIZE = 1024
+    
+    def analyze(self, text: str) -> Mapping[str, Any]:
         """
         Analyze sentiment of the given text.
         
@@ -75,31 +134,26 @@ class SentimentAnalyzer:
             text: Input text to analyze
             
         Returns:
-            Dictionary containing:
+            Mapping containing (read-only for empty text):
                 - label: Sentiment label (very_negative to very_positive)
                 - score: Sentiment score (-1.0 to 1.0)
                 - confidence: Model confidence (0.0 to 1.0)
                 - raw_label: Original model output label
         """
-        if not text or not text.strip():
-            return {
-                "label": "neutral",
-                "score": 0.0,
-                "confidence": 0.0,
-                "raw_label": None
-            }
+        if not text or text.isspace():
+            return EMPTY_TEXT_SENTIMENT
         
-        # Truncate very long text
-        text = text[:5000] if len(text) > 5000 else text
+        # Truncate very long text (bounds tokenizer work; no copy when short)
+        text = text[:5000]
         
         # Get prediction from BERT model
+        self.load()
         result = self._pipeline(text)[0]
         raw_label = result["label"]
         confidence = result["score"]
         
         # Map to our sentiment labels
-        sentiment_label = self.SENTIMENT_LABELS.get(raw_label, "neutral")
-        sentiment_score = self.SENTIMENT_SCORES.get(sentiment_label, 0.0)
+        sentiment_label, sentiment_score = self._RAW_LABEL_LUT.get(raw_label, self._NEUTRAL)
         
         return {
             "label": sentiment_label,
@@ -108,35 +162,56 @@ class SentimentAnalyzer:
             "raw_label": raw_label
         }
     
-    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def analyze_batch(self, texts: List[str], batch_size: int = 32) -> List[Mapping[str, Any]]:
         """
         Analyze sentiment of multiple texts.
         
         Args:
             texts: List of input texts
+            batch_size: Number of texts padded into each forward pass
             
         Returns:
-            List of sentiment analysis results
+            List of sentiment analysis results; empty texts get the shared
+            read-only EMPTY_TEXT_SENTIMENT, as with analyze()
         """
         if not texts:
             return []
         
-        # Truncate long texts
-        processed_texts = [t[:5000] if len(t) > 5000 else t for t in texts]
+        # Truncate long texts (bounds tokenizer work; no copy when short)
+        processed_texts = [t[:5000] for t in texts]
+        analyses = [EMPTY_TEXT_SENTIMENT] * len(processed_texts)
+        
+        # Only non-empty texts reach the model. They run in length order so
+        # each padded batch holds similar-length texts and little compute
+        # goes to padding; results are put back in input order below
+        order = sorted(
+            (i for i, t in enumerate(processed_texts) if t and not t.isspace()),
+            key=lambda i: len(processed_texts[i])
+        )
+        if not order:
+            return analyses
         
-        results = self._pipeline(processed_texts)
+        # Batches never straddle a length bucket, so one long text can't
+        # pad a batch of short ones up to its length
+        lengths = [len(processed_texts[i]) for i in order]
+        bounds = [0, *(bisect.bisect_right(lengths, limit) for limit in self._LENGTH_BUCKETS), len(order)]
         
-        return [
-            {
-                "label": self.SENTIMENT_LABELS.get(r["label"], "neutral"),
-                "score": self.SENTIMENT_SCORES.get(
-                    self.SENTIMENT_LABELS.get(r["label"], "neutral"), 0.0
-                ),
-                "confidence": r["score"],
-                "raw_label": r["label"]
-            }
-            for r in results
-        ]
+        self.load()
+        lut = self._RAW_LABEL_LUT
+        for start, end in zip(bounds, bounds[1:]):
+            if start == end:
+                continue
+            bucket = order[start:end]
+            results = self._pipeline([processed_texts[i] for i in bucket], batch_size=batch_size)
+            for i, r in zip(bucket, results):
+                label, score = lut.get(r["label"], self._NEUTRAL)
+                analyses[i] = {
+                    "label": label,
+                    "score": score,
+                    "confidence": r["score"],
+                    "raw_label": r["label"]
+                }
+        return analyses
     
     def get_sentiment_category(self, score: float) -> str:
         """
@@ -148,26 +223,58 @@ class SentimentAnalyzer:
         Returns:
             Sentiment category label
         """
-        if score <= -0.75:
-            return "very_negative"
-        elif score <= -0.25:
-            return "negative"
-        elif score <= 0.25:
-            return "neutral"
-        elif score <= 0.75:
-            return "positive"
-        else:
-            return "very_positive"
+        return self._CATEGORY_LABELS[bisect.bisect_left(self._CATEGORY_BOUNDS, score)]
+    
+    def get_sentiment_category_array(self, scores: Sequence[float]) -> np.ndarray:
+        """
+        Vectorized get_sentiment_category for many scores at once.
+        
+        Args:
+            scores: Sentiment scores (-1.0 to 1.0)
+            
+        Returns:
+            numpy array of sentiment category labels
+        """
+        indices = np.digitize(scores, self._CATEGORY_BOUNDS, right=True)
+        return np.asarray(self._CATEGORY_LABELS)[indices]
+    
+    def classify(self, text: str) -> SentimentLabel:
+        """
+        Get the sentiment category of a text, reusing recent analyses.
+        
+        Results are memoized per process (not shared between workers) by
+        a digest of the text, so asking several questions about the same
+        text runs BERT once.
+        
+        Args:
+            text: Input text to classify
+            
+        Returns:
+            Sentiment category
+        """
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        # The memo is keyed on the digest alone; the text reaches a miss
+        # through this thread's slot
+        self._classify_pending.text = text
+        return self._classify_cached(key)
+    
+    def _classify_digest(self, key: bytes) -> SentimentLabel:
+        """Analyze the pending text of this thread (memoized by classify)."""
+        return SentimentLabel(self.analyze(self._classify_pending.text)["label"])
     
     def is_negative(self, text: str) -> bool:
         """Check if text has negative sentiment."""
-        result = self.analyze(text)
-        return result["score"] < -0.25
+        return self.classify(text) in (SentimentLabel.VERY_NEGATIVE, SentimentLabel.NEGATIVE)
     
     def is_positive(self, text: str) -> bool:
         """Check if text has positive sentiment."""
-        result = self.analyze(text)
-        return result["score"] > 0.25
+        return self.classify(text) in (SentimentLabel.POSITIVE, SentimentLabel.VERY_POSITIVE)
+
+
+SentimentAnalyzer._RAW_LABEL_LUT = {
+    raw: (label, SentimentAnalyzer.SENTIMENT_SCORES[label])
+    for raw, label in SentimentAnalyzer.SENTIMENT_LABELS.items()
+}
 
 
 # Global instance
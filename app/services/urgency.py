@@ -3,8 +3,10 @@ Dynamic Urgency Scoring Service.
 Calculates urgency scores (1-10) based on sentiment, keywords, and issue type.
 """
 
+import bisect
 import re
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Mapping, NamedTuple, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -14,15 +16,101 @@ from app.models.ticket import UrgencyLevel, KnowledgeTier
 
 settings = get_settings()
 
+# Urgent language indicators; each one that hits adds 0.25. Whole-word
+# literals are checked against the text's token set, and only phrases and
+# punctuation runs need a regex. Text is already lowercased.
+_TOKEN_PATTERN = re.compile(r'\w+')
+_URGENT_INDICATORS = (
+    (frozenset({"asap", "immediately", "urgent", "emergency"}), None),
+    (frozenset({"broken", "down", "failed"}), re.compile(r'\bnot working\b')),
+    (frozenset(), re.compile(r'\b(?:cannot|can\'t|unable to)\s+(?:access|login|connect)')),
+    (frozenset({"blocked", "stuck", "frozen"}), None),
+    (frozenset(), re.compile(r'!!!+|\?\?\?+')),  # Multiple punctuation
+)
 
-@dataclass
+
+def _compile_keywords(keywords) -> "re.Pattern":
+    """
+    Compile literal keywords into one pattern that finds them in a single pass.
+
+    The lookahead makes finditer report overlapping hits (e.g. "mail" inside
+    "email"), so every keyword contained in the text is found, as with
+    separate substring checks.
+
+    Args:
+        keywords: Lowercase literal keywords
+
+    Returns:
+        Compiled pattern whose group 1 is the matched keyword
+    """
+    alternation = "|".join(
+        re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)
+    )
+    return re.compile(f"(?=({alternation}))")
+
+
+# Keyword settings are resolved and compiled once at import, not per instance.
+# The rank of each keyword is its position in the setting, which decides
+# the keyword reported when several match.
+_CRITICAL_PATTERN = _compile_keywords(settings.critical_keywords_list)
+_HIGH_PATTERN = _compile_keywords(settings.high_urgency_keywords_list)
+_CRITICAL_RANK = {k: i for i, k in enumerate(settings.critical_keywords_list)}
+_HIGH_RANK = {k: i for i, k in enumerate(settings.high_urgency_keywords_list)}
+
+
+class Factors(NamedTuple):
+    """Points contributed by each urgency factor."""
+    sentiment: float  # 0-3
+    keywords: float  # 0-4
+    category: float  # 0-2
+    user_tier: float  # 0-1
+    text_indicators: float  # 0-1
+
+
+@dataclass(frozen=True, slots=True)
 class UrgencyResult:
-    """Result of urgency calculation."""
+    """Result of urgency calculation (immutable, so cached results are shared)."""
     score: int  # 1-10
     level: UrgencyLevel
     tier: KnowledgeTier
-    factors: Dict[str, float]
-    explanation: str
+    factors: Factors
+    keywords: Tuple[str, ...]  # Matched critical/high keywords
+    category: str  # Given or detected category
+    
+    @property
+    def explanation(self) -> str:
+        """Human-readable explanation, built only when a caller asks for it."""
+        parts = [f"Urgency Score: {self.score}/10 ({self.level.value.upper()})"]
+        
+        if self.keywords:
+            parts.append(f"Critical keywords detected: {', '.join(self.keywords)}")
+        
+        if self.factors.sentiment > 1.5:
+            parts.append("Negative sentiment detected in message")
+        
+        if self.category != "general":
+            parts.append(f"Category: {self.category}")
+        
+        if self.factors.text_indicators > 0:
+            parts.append("Urgent language patterns detected")
+        
+        return " | ".join(parts)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to JSON-ready primitives for API responses.
+        
+        Returns:
+            Dictionary with score, level, tier, factors, and explanation
+        """
+        return {
+            "score": self.score,
+            "level": self.level.value,
+            "tier": self.tier.value,
+            "factors": self.factors._asdict(),
+            "explanation": self.explanation
+        }
+
 
 
 class UrgencyCalculator:
@@ -49,6 +137,19 @@ class UrgencyCalculator:
         "general": 3
     }
     
+    # Keywords used to detect a category when none is given, in precedence order
+    CATEGORY_KEYWORDS = {
+        "payment": ["payment", "billing", "invoice", "charge", "refund", "transaction"],
+        "security": ["security", "breach", "hack", "virus", "malware", "phishing", "vulnerability"],
+        "outage": ["outage", "down", "offline", "unavailable", "503", "500 error"],
+        "authentication": ["login", "password", "auth", "sso", "mfa", "2fa", "locked out"],
+        "email": ["email", "outlook", "inbox", "smtp", "mail"],
+        "network": ["vpn", "network", "wifi", "internet", "connection", "dns"],
+        "hardware": ["printer", "laptop", "monitor", "keyboard", "mouse", "hardware"],
+        "database": ["database", "sql", "query", "replication", "backup"],
+        "performance": ["slow", "performance", "lag", "timeout", "memory"],
+    }
+    
     # Urgency level thresholds
     URGENCY_THRESHOLDS = {
         UrgencyLevel.CRITICAL: 8,  # 8-10
@@ -64,18 +165,46 @@ class UrgencyCalculator:
         KnowledgeTier.L1: 1   # Low issues start at L1
     }
     
+    # Threshold tables flattened for bisect (filled in after the class body):
+    # _LEVELS[i] applies from _LEVEL_CUTS[i - 1] up, _LEVELS[0] below them all
+    _LEVEL_CUTS: Tuple[int, ...] = ()
+    _LEVELS: Tuple[UrgencyLevel, ...] = ()
+    _TIER_CUTS: Tuple[int, ...] = ()
+    _TIERS: Tuple[KnowledgeTier, ...] = ()
+    
+    # CATEGORY_URGENCY base scaled to the 0-2 category factor (filled in
+    # after the class body); unknown categories use a base of 3
+    _CATEGORY_FACTORS: Dict[str, float] = {}
+    _DEFAULT_CATEGORY_FACTOR = round((3 / 10) * 2, 2)
+    
+    # All category keywords in one pattern so the text is scanned once
+    # (filled in after the class body)
+    _KEYWORD_CATEGORY: Dict[str, str] = {}
+    _CATEGORY_PATTERN: "re.Pattern" = None
+    
+    # Memoized results of calculate; longer texts (characters) are not cached
+    _RESULT_CACHE_SIZE = 4096
+    _MAX_CACHED_TEXT = 8192
+    
     def __init__(self, sentiment_service: SentimentAnalyzer = None):
         """Initialize with sentiment analyzer."""
         self._sentiment = sentiment_service or sentiment_analyzer
-        self._critical_keywords = settings.critical_keywords_list
-        self._high_keywords = settings.high_urgency_keywords_list
+        self._critical_pattern = _CRITICAL_PATTERN
+        self._high_pattern = _HIGH_PATTERN
+        self._critical_rank = _CRITICAL_RANK
+        self._high_rank = _HIGH_RANK
+        
+        # Scoring is deterministic in its inputs, so repeated tickets (retries,
+        # duplicate submissions, re-analysis) are served from an LRU cache
+        self._score_cached = lru_cache(maxsize=self._RESULT_CACHE_SIZE)(self._score)
     
     def calculate(
         self,
         title: str,
         description: str,
         category: Optional[str] = None,
-        user_tier: Optional[str] = None
+        user_tier: Optional[str] = None,
+        sentiment_result: Optional[Mapping[str, Any]] = None
     ) -> UrgencyResult:
         """
         Calculate dynamic urgency score for a ticket.
@@ -85,45 +214,98 @@ class UrgencyCalculator:
             description: Ticket description
             category: Optional category classification
             user_tier: Optional user subscription tier (premium, standard, basic)
+            sentiment_result: Optional sentiment analysis of "{title} {description}"
+                already computed by the caller; skips running BERT again
             
         Returns:
-            UrgencyResult with score, level, tier, factors, and explanation
+            UrgencyResult with score, level, tier, factors, keywords, and category
+            (explanation is derived on access)
+        """
+        if sentiment_result is not None:
+            return self._score(title, description, category, user_tier, sentiment_result)
+        if len(title) + len(description) <= self._MAX_CACHED_TEXT:
+            return self._score_cached(title, description, category, user_tier)
+        return self._score(title, description, category, user_tier)
+    
+    def calculate_batch(self, cases: List[Mapping[str, Any]]) -> List[UrgencyResult]:
+        """
+        Calculate urgency for several tickets with one batched sentiment pass.
+        
+        Args:
+            cases: Tickets as mappings with "title" and "description", and
+                optionally "category" and "user_tier"
+            
+        Returns:
+            List of UrgencyResult, in the same order as cases
+        """
+        if not cases:
+            return []
+        
+        sentiments = self._sentiment.analyze_batch(
+            [f"{case['title']} {case['description']}" for case in cases]
+        )
+        return [
+            self.calculate(
+                title=case["title"],
+                description=case["description"],
+                category=case.get("category"),
+                user_tier=case.get("user_tier"),
+                sentiment_result=sentiment
+            )
+            for case, sentiment in zip(cases, sentiments)
+        ]
+    
+    def _score(
+        self,
+        title: str,
+        description: str,
+        category: Optional[str],
+        user_tier: Optional[str],
+        sentiment_result: Optional[Mapping[str, Any]] = None
+    ) -> UrgencyResult:
+        """
+        Score a ticket (the uncached body of calculate).
+
+        Args:
+            title: Ticket title
+            description: Ticket description
+            category: Optional category classification
+            user_tier: Optional user subscription tier
+            sentiment_result: Optional precomputed sentiment analysis
+
+        Returns:
+            UrgencyResult
         """
         combined_text = f"{title} {description}".lower()
-        factors = {}
         
         # 1. Sentiment Analysis Factor (0-3 points)
-        sentiment_result = self._sentiment.analyze(combined_text)
+        if sentiment_result is None:
+            sentiment_result = self._sentiment.analyze(combined_text)
         sentiment_score = sentiment_result["score"]  # -1 to 1
         
         # Invert and scale: very negative (-1) -> 3 points, positive (1) -> 0 points
         sentiment_factor = max(0, (1 - sentiment_score) * 1.5)  # 0-3 range
-        factors["sentiment"] = round(sentiment_factor, 2)
+        sentiment_factor = round(sentiment_factor, 2)
         
         # 2. Critical Keywords Factor (0-4 points)
         keyword_factor = 0.0
         matched_keywords = []
         
-        for keyword in self._critical_keywords:
-            if keyword in combined_text:
-                keyword_factor = 4.0  # Critical keyword found
+        keyword = self._first_keyword(self._critical_pattern, self._critical_rank, combined_text)
+        if keyword:
+            keyword_factor = 4.0  # Critical keyword found
+            matched_keywords.append(keyword)
+        else:
+            keyword = self._first_keyword(self._high_pattern, self._high_rank, combined_text)
+            if keyword:
+                keyword_factor = 2.5  # High urgency keyword
                 matched_keywords.append(keyword)
-                break
-        
-        if keyword_factor == 0:
-            for keyword in self._high_keywords:
-                if keyword in combined_text:
-                    keyword_factor = 2.5  # High urgency keyword
-                    matched_keywords.append(keyword)
-                    break
-        
-        factors["keywords"] = keyword_factor
         
         # 3. Category Factor (0-2 points)
         detected_category = category or self._detect_category(combined_text)
-        category_base = self.CATEGORY_URGENCY.get(detected_category, 3)
-        category_factor = (category_base / 10) * 2  # Scale to 0-2
-        factors["category"] = round(category_factor, 2)
+        category_factor = self._CATEGORY_FACTORS.get(
+            detected_category, self._DEFAULT_CATEGORY_FACTOR
+        )
         
         # 4. User Tier Factor (0-1 points)
         user_factor = 0.0
@@ -131,27 +313,26 @@ class UrgencyCalculator:
             user_factor = 1.0
         elif user_tier == "standard":
             user_factor = 0.5
-        factors["user_tier"] = user_factor
         
         # 5. Text Indicators Factor (0-1 points)
+        tokens = set(_TOKEN_PATTERN.findall(combined_text))
         indicator_factor = 0.0
-        urgent_patterns = [
-            r'\b(asap|immediately|urgent|emergency)\b',
-            r'\b(not working|broken|down|failed)\b',
-            r'\b(cannot|can\'t|unable to)\s+(access|login|connect)',
-            r'\b(blocked|stuck|frozen)\b',
-            r'!!!+|\?\?\?+',  # Multiple punctuation
-        ]
-        
-        for pattern in urgent_patterns:
-            if re.search(pattern, combined_text, re.IGNORECASE):
+        for words, pattern in _URGENT_INDICATORS:
+            if not words.isdisjoint(tokens) or (pattern and pattern.search(combined_text)):
                 indicator_factor += 0.25
         
         indicator_factor = min(indicator_factor, 1.0)
-        factors["text_indicators"] = round(indicator_factor, 2)
+        
+        factors = Factors(
+            sentiment=sentiment_factor,
+            keywords=keyword_factor,
+            category=category_factor,
+            user_tier=user_factor,
+            text_indicators=round(indicator_factor, 2)
+        )
         
         # Calculate total score (1-10)
-        raw_score = sum(factors.values())
+        raw_score = sum(factors)
         final_score = max(1, min(10, round(raw_score)))
         
         # Determine urgency level
@@ -160,85 +341,79 @@ class UrgencyCalculator:
         # Determine initial tier assignment
         assigned_tier = self._get_tier_assignment(final_score)
         
-        # Build explanation
-        explanation = self._build_explanation(
-            final_score, urgency_level, factors, matched_keywords, detected_category
-        )
-        
         return UrgencyResult(
             score=final_score,
             level=urgency_level,
             tier=assigned_tier,
             factors=factors,
-            explanation=explanation
+            keywords=tuple(matched_keywords),
+            category=detected_category
         )
     
+    @staticmethod
+    def _first_keyword(pattern: "re.Pattern", rank: Dict[str, int], text: str) -> Optional[str]:
+        """
+        Find the keyword to report for a keyword pattern.
+
+        Args:
+            pattern: Pattern built by _compile_keywords
+            rank: Position of each keyword in its setting
+            text: Lowercased ticket text
+
+        Returns:
+            First keyword found in configured order, or None
+        """
+        hits = {match.group(1) for match in pattern.finditer(text)}
+        return min(hits, key=rank.__getitem__) if hits else None
+    
     def _detect_category(self, text: str) -> str:
-        """Detect ticket category from text content."""
-        category_keywords = {
-            "payment": ["payment", "billing", "invoice", "charge", "refund", "transaction"],
-            "security": ["security", "breach", "hack", "virus", "malware", "phishing", "vulnerability"],
-            "outage": ["outage", "down", "offline", "unavailable", "503", "500 error"],
-            "authentication": ["login", "password", "auth", "sso", "mfa", "2fa", "locked out"],
-            "email": ["email", "outlook", "inbox", "smtp", "mail"],
-            "network": ["vpn", "network", "wifi", "internet", "connection", "dns"],
-            "hardware": ["printer", "laptop", "monitor", "keyboard", "mouse", "hardware"],
-            "database": ["database", "sql", "query", "replication", "backup"],
-            "performance": ["slow", "performance", "lag", "timeout", "memory"],
+        """Detect ticket category from already-lowercased text content."""
+        hits = {
+            self._KEYWORD_CATEGORY[match.group(1)]
+            for match in self._CATEGORY_PATTERN.finditer(text)
         }
         
-        text_lower = text.lower()
-        for category, keywords in category_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return category
+        # Earlier categories take precedence, as with a per-category scan
+        for category in self.CATEGORY_KEYWORDS:
+            if category in hits:
+                return category
         
         return "general"
     
     def _get_urgency_level(self, score: int) -> UrgencyLevel:
         """Map score to urgency level."""
-        if score >= self.URGENCY_THRESHOLDS[UrgencyLevel.CRITICAL]:
-            return UrgencyLevel.CRITICAL
-        elif score >= self.URGENCY_THRESHOLDS[UrgencyLevel.HIGH]:
-            return UrgencyLevel.HIGH
-        elif score >= self.URGENCY_THRESHOLDS[UrgencyLevel.MEDIUM]:
-            return UrgencyLevel.MEDIUM
-        else:
-            return UrgencyLevel.LOW
+        return self._LEVELS[bisect.bisect_right(self._LEVEL_CUTS, score)]
     
     def _get_tier_assignment(self, score: int) -> KnowledgeTier:
         """Assign initial tier based on urgency score."""
-        if score >= self.TIER_THRESHOLDS[KnowledgeTier.L3]:
-            return KnowledgeTier.L3
-        elif score >= self.TIER_THRESHOLDS[KnowledgeTier.L2]:
-            return KnowledgeTier.L2
-        else:
-            return KnowledgeTier.L1
-    
-    def _build_explanation(
-        self,
-        score: int,
-        level: UrgencyLevel,
-        factors: Dict[str, float],
-        keywords: List[str],
-        category: str
-    ) -> str:
-        """Build human-readable explanation of urgency calculation."""
-        parts = [f"Urgency Score: {score}/10 ({level.value.upper()})"]
-        
-        if keywords:
-            parts.append(f"Critical keywords detected: {', '.join(keywords)}")
-        
-        if factors["sentiment"] > 1.5:
-            parts.append("Negative sentiment detected in message")
-        
-        if category != "general":
-            parts.append(f"Category: {category}")
-        
-        if factors["text_indicators"] > 0:
-            parts.append("Urgent language patterns detected")
-        
-        return " | ".join(parts)
+        return self._TIERS[bisect.bisect_right(self._TIER_CUTS, score)]
+
+
+def _threshold_table(thresholds: Dict[Any, int]) -> Tuple[Tuple[int, ...], Tuple[Any, ...]]:
+    """Split a {value: minimum score} mapping into bisect cuts and values."""
+    ordered = sorted(thresholds.items(), key=lambda item: item[1])
+    return tuple(cut for _, cut in ordered[1:]), tuple(value for value, _ in ordered)
+
+
+UrgencyCalculator._LEVEL_CUTS, UrgencyCalculator._LEVELS = _threshold_table(
+    UrgencyCalculator.URGENCY_THRESHOLDS
+)
+UrgencyCalculator._TIER_CUTS, UrgencyCalculator._TIERS = _threshold_table(
+    UrgencyCalculator.TIER_THRESHOLDS
+)
+
+UrgencyCalculator._CATEGORY_FACTORS = {
+    category: round((base / 10) * 2, 2)
+    for category, base in UrgencyCalculator.CATEGORY_URGENCY.items()
+}
+
+# Reversed so the earliest category wins a keyword listed twice
+UrgencyCalculator._KEYWORD_CATEGORY = {
+    keyword: category
+    for category, keywords in reversed(UrgencyCalculator.CATEGORY_KEYWORDS.items())
+    for keyword in keywords
+}
+UrgencyCalculator._CATEGORY_PATTERN = _compile_keywords(UrgencyCalculator._KEYWORD_CATEGORY)
 
 
 # Global instance
@@ -0,0 +1,129 @@
+"""
+In-Memory Knowledge Base Vector Index.
+Serves the nearest-neighbour step of hybrid search from a normalized
+embedding matrix held in process, instead of an HNSW scan per query.
+"""
+
+import asyncio
+import time
+import numpy as np
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+
+from app.config import get_settings
+from app.models.knowledge import KnowledgeBase
+from app.models.ticket import KnowledgeTier, TIER_VALUES
+
+settings = get_settings()
+
+
+class KnowledgeVectorIndex:
+    """
+    Normalized (N, 384) float32 matrix of active knowledge base embeddings.
+
+    The matrix is built lazily on first use and rebuilt after invalidate()
+    or once it is older than KB_MEMORY_INDEX_TTL seconds (so changes made
+    by other workers are picked up). Candidates it returns are re-checked
+    against the database, so a stale index can only miss entries, never
+    return inactive or re-tiered ones.
+    """
+
+    def __init__(self, ttl_seconds: int = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            ttl_seconds: Maximum age of the matrix before a rebuild
+        """
+        self.ttl_seconds = ttl_seconds or settings.kb_memory_index_ttl
+        self._matrix = np.zeros((0, 384), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._tiers = np.zeros(0, dtype=object)
+        self._built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Force a rebuild on next use (e.g. after knowledge base changes)."""
+        self._built_at = None
+
+    def _is_fresh(self) -> bool:
+        """Whether the matrix can be used without rebuilding."""
+        return (
+            self._built_at is not None
+            and time.monotonic() - self._built_at < self.ttl_seconds
+        )
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """
+        Load all active embeddings and rebuild the matrix.
+
+        Args:
+            session: Database session
+        """
+        result = await session.execute(
+            select(KnowledgeBase.id, KnowledgeBase.tier, KnowledgeBase.embedding)
+            .where(
+                and_(
+                    KnowledgeBase.is_active == True,
+                    KnowledgeBase.embedding.isnot(None)
+                )
+            )
+        )
+        rows = result.all()
+
+        if rows:
+            matrix = np.stack([np.asarray(row.embedding, dtype=np.float32) for row in rows])
+            matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+        else:
+            matrix = np.zeros((0, 384), dtype=np.float32)
+
+        self._matrix = matrix
+        self._ids = np.array([row.id for row in rows], dtype=np.int64)
+        self._tiers = np.array([TIER_VALUES[row.tier] for row in rows], dtype=object)
+        self._built_at = time.monotonic()
+
+    async def nearest(
+        self,
+        session: AsyncSession,
+        query_embedding: np.ndarray,
+        k: int,
+        tiers: Optional[Sequence[KnowledgeTier]] = None
+    ) -> List[int]:
+        """
+        Find the ids of the k most similar active entries.
+
+        Args:
+            session: Database session, used only when a rebuild is due
+            query_embedding: Query embedding
+            k: Number of ids to return
+            tiers: Optional tiers to restrict the search to
+
+        Returns:
+            Entry ids, unordered
+        """
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    await self.refresh(session)
+
+        matrix, ids, entry_tiers = self._matrix, self._ids, self._tiers
+        if tiers:
+            keep = np.isin(entry_tiers, [TIER_VALUES[tier] for tier in tiers])
+            matrix, ids = matrix[keep], ids[keep]
+
+        if not len(ids):
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        similarities = matrix @ query
+
+        if k < len(ids):
+            top = np.argpartition(-similarities, k - 1)[:k]
+            ids = ids[top]
+
+        return ids.tolist()
+
+
+# Global instance
+kb_vector_index = KnowledgeVectorIndex()
@@ -36,8 +36,9 @@ async def demo_semantic_search():
     
     print("Generating embeddings for test queries...\n")
     
-    for query in queries:
-        embedding = semantic_search_service.encode(query)
+    # One batched forward pass for all queries
+    embeddings = semantic_search_service.encode_batch(queries)
+    for query, embedding in zip(queries, embeddings):
         print(f"  Query: \"{query}\"")
         print(f"  Embedding shape: {embedding.shape}")
         print(f"  First 5 values: {embedding[:5].round(4)}")
@@ -45,9 +46,11 @@ async def demo_semantic_search():
     
     # Test similarity
     print("Testing semantic similarity...")
-    emb1 = semantic_search_service.encode("Cannot access my email account")
-    emb2 = semantic_search_service.encode("Email login not working")
-    emb3 = semantic_search_service.encode("How to cook pasta")
+    emb1, emb2, emb3 = semantic_search_service.encode_batch([
+        "Cannot access my email account",
+        "Email login not working",
+        "How to cook pasta"
+    ])
     
     sim_similar = semantic_search_service.similarity(emb1, emb2)
     sim_different = semantic_search_service.similarity(emb1, emb3)
@@ -108,12 +111,10 @@ async def demo_urgency_scoring():
         }
     ]
     
-    for case in test_cases:
-        result = urgency_calculator.calculate(
-            title=case["title"],
-            description=case["description"]
-        )
-        
+    # One batched sentiment pass for all cases
+    results = urgency_calculator.calculate_batch(test_cases)
+    
+    for case, result in zip(test_cases, results):
         # Create urgency bar visualization
         bar = "█" * result.score + "░" * (10 - result.score)
         
@@ -121,7 +122,7 @@ async def demo_urgency_scoring():
         print(f"  Urgency: [{bar}] {result.score}/10")
         print(f"  Level: {result.level.value.upper()}")
         print(f"  Tier: {result.tier.value}")
-        print(f"  Factors: {result.factors}")
+        print(f"  Factors: {result.factors._asdict()}")
         print()
 
 
@@ -206,7 +207,9 @@ async def demo_workflow():
     
     # Step 2: Urgency Scoring
     print("  Step 2: Dynamic Urgency Calculation")
-    urgency = urgency_calculator.calculate(ticket['title'], ticket['description'])
+    urgency = urgency_calculator.calculate(
+        ticket['title'], ticket['description'], sentiment_result=sentiment
+    )
     bar = "█" * urgency.score + "░" * (10 - urgency.score)
     print(f"     → Urgency: [{bar}] {urgency.score}/10 ({urgency.level.value})")
     print(f"     → Assigned Tier: {urgency.tier.value}")
@@ -230,6 +233,25 @@ async def demo_workflow():
     print("  ✅ Workflow Complete!")
 
 
+async def run_demos():
+    """Load both models concurrently, then run the demos in order."""
+    from app.services.semantic_search import semantic_search_service
+    from app.services.sentiment import sentiment_analyzer
+    
+    await asyncio.gather(
+        asyncio.to_thread(semantic_search_service.load),
+        asyncio.to_thread(sentiment_analyzer.load)
+    )
+    
+    # Sequential so each section's output stays together
+    await demo_semantic_search()
+    await demo_sentiment_analysis()
+    await demo_urgency_scoring()
+    await demo_tiered_knowledge()
+    await demo_auto_promotion()
+    await demo_workflow()
+
+
 def main():
     """Run all demos."""
     print("\n" + "🔧" * 30)
@@ -237,16 +259,8 @@ def main():
     print("     Tiered RAG | MiniLM Search | BERT Sentiment Analysis")
     print("\n" + "🔧" * 30)
     
-    loop = asyncio.get_event_loop()
-    
     try:
-        # Run demos
-        loop.run_until_complete(demo_semantic_search())
-        loop.run_until_complete(demo_sentiment_analysis())
-        loop.run_until_complete(demo_urgency_scoring())
-        loop.run_until_complete(demo_tiered_knowledge())
-        loop.run_until_complete(demo_auto_promotion())
-        loop.run_until_complete(demo_workflow())
+        asyncio.run(run_demos())
         
         print_header("✨ Demo Complete!")
         print("  To run the full API server:")
@@ -0,0 +1,159 @@
+"""
+Export the MiniLM and BERT sentiment models to ONNX with INT8 dynamic
+quantization, for use with MODEL_BACKEND=onnx.
+
+With --static, the sentiment model is instead statically quantized:
+activation ranges are calibrated on recent ticket text from the database
+(or --calibration-file, one text per line), so no activations are
+quantized at inference time.
+
+Usage:
+    pip install "optimum[onnxruntime]"    # --static also needs: pip install datasets
+    python scripts/export_onnx.py [--arch avx512_vnni|avx2|arm64]
+        [--static [--calibration-file tickets.txt] [--calibration-size 100]]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings
+from app.services.onnx_backend import MINILM_SUBDIR, SENTIMENT_SUBDIR
+
+
+def _export_model(model_cls, model_id: str, out_dir: Path):
+    """Export one model to ONNX alongside its tokenizer, returning the tokenizer."""
+    from transformers import AutoTokenizer
+
+    print(f"Exporting {model_id} -> {out_dir}")
+    model = model_cls.from_pretrained(model_id, export=True)
+    model.save_pretrained(out_dir)
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    tokenizer.save_pretrained(out_dir)
+    return tokenizer
+
+
+def export(model_cls, model_id: str, out_dir: Path, arch: str) -> None:
+    """Export one model to ONNX and write a dynamically quantized copy."""
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    _export_model(model_cls, model_id, out_dir)
+
+    qconfig = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+    quantizer = ORTQuantizer.from_pretrained(out_dir)
+    quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+    print(f"Quantized ({arch}) model written to {out_dir}")
+
+
+def load_calibration_texts(path: Optional[str], limit: int) -> List[str]:
+    """
+    Collect representative ticket text for static quantization.
+
+    Args:
+        path: Optional file with one text per line; otherwise recent tickets
+            are read from the database
+        limit: Maximum number of texts
+
+    Returns:
+        List of calibration texts
+    """
+    if path:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return [line for line in lines if line.strip()][:limit]
+
+    from sqlalchemy import text
+    from app.database.connection import sync_engine
+
+    with sync_engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT title || ' ' || description FROM tickets "
+                "ORDER BY created_at DESC LIMIT :limit"
+            ),
+            {"limit": limit}
+        )
+        return [row[0] for row in rows]
+
+
+def export_static(model_cls, model_id: str, out_dir: Path, arch: str, texts: List[str]) -> None:
+    """Export one model to ONNX and write a statically quantized copy."""
+    from datasets import Dataset
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoCalibrationConfig, AutoQuantizationConfig
+
+    tokenizer = _export_model(model_cls, model_id, out_dir)
+
+    calibration = Dataset.from_dict({"text": texts}).map(
+        lambda batch: tokenizer(batch["text"], padding="max_length", truncation=True, max_length=128),
+        batched=True,
+        remove_columns=["text"]
+    )
+
+    qconfig = getattr(AutoQuantizationConfig, arch)(is_static=True, per_channel=False)
+    quantizer = ORTQuantizer.from_pretrained(out_dir, file_name="model.onnx")
+    ranges = quantizer.fit(
+        dataset=calibration,
+        calibration_config=AutoCalibrationConfig.minmax(calibration),
+        operators_to_quantize=qconfig.operators_to_quantize
+    )
+    quantizer.quantize(
+        save_dir=out_dir,
+        quantization_config=qconfig,
+        calibration_tensors_range=ranges
+    )
+    print(f"Statically quantized ({arch}, {len(texts)} calibration texts) model written to {out_dir}")
+
+
+def main():
+    from optimum.onnxruntime import (
+        ORTModelForFeatureExtraction,
+        ORTModelForSequenceClassification
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--arch",
+        default="avx512_vnni",
+        choices=["avx512_vnni", "avx512", "avx2", "arm64"],
+        help="Target instruction set for quantized kernels"
+    )
+    parser.add_argument(
+        "--static",
+        action="store_true",
+        help="Statically quantize the sentiment model with calibration data"
+    )
+    parser.add_argument(
+        "--calibration-file",
+        help="Calibration texts, one per line (default: recent tickets from the database)"
+    )
+    parser.add_argument(
+        "--calibration-size",
+        type=int,
+        default=100,
+        help="Maximum number of calibration texts"
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    root = Path(settings.onnx_model_dir)
+
+    export(ORTModelForFeatureExtraction, settings.minilm_model, root / MINILM_SUBDIR, args.arch)
+
+    if args.static:
+        texts = load_calibration_texts(args.calibration_file, args.calibration_size)
+        if not texts:
+            sys.exit("No calibration texts found; pass --calibration-file")
+        export_static(
+            ORTModelForSequenceClassification, settings.bert_sentiment_model,
+            root / SENTIMENT_SUBDIR, args.arch, texts
+        )
+    else:
+        export(ORTModelForSequenceClassification, settings.bert_sentiment_model, root / SENTIMENT_SUBDIR, args.arch)
+
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,7 @@ CREATE TABLE IF NOT EXISTS knowledge_base (
     success_rate FLOAT DEFAULT 0.0,
     avg_feedback_score FLOAT DEFAULT 0.0,
     embedding vector(384),
+    search_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', title || ' ' || content)) STORED,
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -82,14 +83,18 @@ CREATE TABLE IF NOT EXISTS promotion_history (
 CREATE INDEX idx_tickets_status ON tickets(status);
 CREATE INDEX idx_tickets_urgency ON tickets(urgency_score DESC);
 CREATE INDEX idx_tickets_created ON tickets(created_at DESC);
+CREATE INDEX idx_tickets_status_urgency_created ON tickets(status, urgency_score DESC, created_at DESC);
 CREATE INDEX idx_kb_tier ON knowledge_base(tier);
 CREATE INDEX idx_kb_category ON knowledge_base(category);
-CREATE INDEX idx_ticket_embedding ON ticket_embeddings USING ivfflat (embedding vector_cosine_ops);
-CREATE INDEX idx_kb_embedding ON knowledge_base USING ivfflat (embedding vector_cosine_ops);
+CREATE INDEX idx_kb_tier_usage_active ON knowledge_base(tier, usage_count DESC) WHERE is_active;
+CREATE INDEX idx_kb_tier_category_active ON knowledge_base(tier, category) INCLUDE (avg_feedback_score) WHERE is_active;
+CREATE INDEX idx_promotion_history_path ON promotion_history(knowledge_id, from_tier, to_tier);
+CREATE INDEX idx_ticket_embedding ON ticket_embeddings USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX idx_kb_embedding ON knowledge_base USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 128);
 
 -- Full-text search index for hybrid search
 CREATE INDEX idx_tickets_fts ON tickets USING gin(to_tsvector('english', title || ' ' || description));
-CREATE INDEX idx_kb_fts ON knowledge_base USING gin(to_tsvector('english', title || ' ' || content));
+CREATE INDEX idx_kb_fts ON knowledge_base USING gin(search_tsv);
 
 -- Insert sample L1 knowledge base entries (FAQ/Common Issues)
 INSERT INTO knowledge_base (tier, title, content, keywords, category) VALUES
@@ -130,3 +135,68 @@ CREATE TRIGGER update_tickets_updated_at BEFORE UPDATE ON tickets
 
 CREATE TRIGGER update_knowledge_base_updated_at BEFORE UPDATE ON knowledge_base
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Precomputed dashboard analytics (refreshed by the API on a schedule)
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_snapshot AS
+    WITH ticket_counts AS (
+        SELECT
+            count(*) AS total_tickets,
+            count(*) FILTER (WHERE status = 'open') AS open_tickets,
+            count(*) FILTER (WHERE status = 'resolved') AS resolved_tickets
+        FROM tickets
+    ),
+    resolution_stats AS (
+        SELECT
+            avg(resolution_time_minutes)::float AS avg_resolution_time,
+            avg(feedback_score)::float AS avg_feedback
+        FROM resolutions
+    )
+    SELECT
+        1 AS id,
+        tc.total_tickets,
+        tc.open_tickets,
+        tc.resolved_tickets,
+        rs.avg_resolution_time,
+        rs.avg_feedback,
+        (
+            SELECT coalesce(jsonb_object_agg(level, c), '{}'::jsonb)
+            FROM (
+                SELECT coalesce(urgency_level::text, 'unknown') AS level, count(*) AS c
+                FROM tickets GROUP BY 1
+            ) u
+        ) AS urgency_distribution,
+        (
+            SELECT coalesce(jsonb_object_agg(tier, c), '{}'::jsonb)
+            FROM (
+                SELECT coalesce(assigned_tier::text, 'unknown') AS tier, count(*) AS c
+                FROM tickets GROUP BY 1
+            ) t
+        ) AS tier_distribution,
+        (
+            SELECT coalesce(jsonb_object_agg(category, c), '{}'::jsonb)
+            FROM (
+                SELECT category, count(*) AS c
+                FROM tickets WHERE category IS NOT NULL GROUP BY category
+            ) cat
+        ) AS category_distribution,
+        (
+            SELECT coalesce(jsonb_object_agg(tier, jsonb_build_object(
+                'count', c,
+                'avg_usage', coalesce(avg_usage, 0),
+                'avg_feedback', coalesce(avg_feedback, 0)
+            )), '{}'::jsonb)
+            FROM (
+                SELECT
+                    coalesce(tier::text, 'unknown') AS tier,
+                    count(*) AS c,
+                    avg(usage_count)::float AS avg_usage,
+                    avg(avg_feedback_score)::float AS avg_feedback
+                FROM knowledge_base
+                WHERE is_active = true
+                GROUP BY 1
+            ) kb
+        ) AS knowledge_base_stats
+    FROM ticket_counts tc, resolution_stats rs;
+
+-- Unique index required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_snapshot_id ON analytics_snapshot(id);
@@ -0,0 +1,4 @@
+-- Composite index for the ticket list: filter by status, then
+-- ORDER BY urgency_score DESC, created_at DESC straight from the index.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_status_urgency_created
+    ON tickets(status, urgency_score DESC, created_at DESC);
@@ -0,0 +1,8 @@
+-- Replace the IVFFlat ticket embedding index with HNSW so nearest-neighbour
+-- lookups in find_similar_tickets stay accurate as tickets accumulate.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ticket_embedding_hnsw
+    ON ticket_embeddings USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_ticket_embedding;
+ALTER INDEX idx_ticket_embedding_hnsw RENAME TO idx_ticket_embedding;
@@ -0,0 +1,65 @@
+-- Dashboard analytics snapshot, refreshed periodically by the API
+-- (ANALYTICS_REFRESH_SECONDS) so /analytics reads a single precomputed row.
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_snapshot AS
+    WITH ticket_counts AS (
+        SELECT
+            count(*) AS total_tickets,
+            count(*) FILTER (WHERE status = 'open') AS open_tickets,
+            count(*) FILTER (WHERE status = 'resolved') AS resolved_tickets
+        FROM tickets
+    ),
+    resolution_stats AS (
+        SELECT
+            avg(resolution_time_minutes)::float AS avg_resolution_time,
+            avg(feedback_score)::float AS avg_feedback
+        FROM resolutions
+    )
+    SELECT
+        1 AS id,
+        tc.total_tickets,
+        tc.open_tickets,
+        tc.resolved_tickets,
+        rs.avg_resolution_time,
+        rs.avg_feedback,
+        (
+            SELECT coalesce(jsonb_object_agg(level, c), '{}'::jsonb)
+            FROM (
+                SELECT coalesce(urgency_level::text, 'unknown') AS level, count(*) AS c
+                FROM tickets GROUP BY 1
+            ) u
+        ) AS urgency_distribution,
+        (
+            SELECT coalesce(jsonb_object_agg(tier, c), '{}'::jsonb)
+            FROM (
+                SELECT coalesce(assigned_tier::text, 'unknown') AS tier, count(*) AS c
+                FROM tickets GROUP BY 1
+            ) t
+        ) AS tier_distribution,
+        (
+            SELECT coalesce(jsonb_object_agg(category, c), '{}'::jsonb)
+            FROM (
+                SELECT category, count(*) AS c
+                FROM tickets WHERE category IS NOT NULL GROUP BY category
+            ) cat
+        ) AS category_distribution,
+        (
+            SELECT coalesce(jsonb_object_agg(tier, jsonb_build_object(
+                'count', c,
+                'avg_usage', coalesce(avg_usage, 0),
+                'avg_feedback', coalesce(avg_feedback, 0)
+            )), '{}'::jsonb)
+            FROM (
+                SELECT
+                    coalesce(tier::text, 'unknown') AS tier,
+                    count(*) AS c,
+                    avg(usage_count)::float AS avg_usage,
+                    avg(avg_feedback_score)::float AS avg_feedback
+                FROM knowledge_base
+                WHERE is_active = true
+                GROUP BY 1
+            ) kb
+        ) AS knowledge_base_stats
+    FROM ticket_counts tc, resolution_stats rs;
+
+-- Unique index required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_snapshot_id ON analytics_snapshot(id);
@@ -0,0 +1,8 @@
+-- Replace the IVFFlat knowledge base embedding index with HNSW; hybrid
+-- search now takes its candidate set from an ORDER BY embedding <=> query scan.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_kb_embedding_hnsw
+    ON knowledge_base USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 128);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_kb_embedding;
+ALTER INDEX idx_kb_embedding_hnsw RENAME TO idx_kb_embedding;
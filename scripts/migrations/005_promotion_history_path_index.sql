@@ -0,0 +1,4 @@
+-- Supports the promotion-history anti-join in check_and_promote, which
+-- skips entries already promoted along the same (from_tier, to_tier) path.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_promotion_history_path
+    ON promotion_history(knowledge_id, from_tier, to_tier);
@@ -0,0 +1,5 @@
+-- Supports the promotion eligibility scans (tier = ? AND is_active AND
+-- usage_count >= ?) in check_and_promote and get_promotion_candidates.
+-- Partial on is_active so retired entries don't bloat the index.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_kb_tier_usage_active
+    ON knowledge_base(tier, usage_count DESC) WHERE is_active;
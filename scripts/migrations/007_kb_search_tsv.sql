@@ -0,0 +1,11 @@
+-- Stores the knowledge base full-text vector instead of recomputing
+-- to_tsvector per row in hybrid_search, and moves the GIN index onto it.
+ALTER TABLE knowledge_base
+    ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', title || ' ' || content)) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_kb_search_tsv
+    ON knowledge_base USING gin(search_tsv);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_kb_fts;
+ALTER INDEX idx_kb_search_tsv RENAME TO idx_kb_fts;
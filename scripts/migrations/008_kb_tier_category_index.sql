@@ -0,0 +1,4 @@
+-- Covering index for the per-(tier, category) aggregation in
+-- get_categories; lets it run as an index-only scan over active entries.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_kb_tier_category_active
+    ON knowledge_base(tier, category) INCLUDE (avg_feedback_score) WHERE is_active;
@@ -5,7 +5,7 @@ Pytest configuration and fixtures.
 import pytest
 import asyncio
 from typing import Generator, AsyncGenerator
-from httpx import AsyncClient
+from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 # Use SQLite for testing
@@ -20,10 +20,32 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session", autouse=True)
+def warm_models():
+    """Load and warm up both models once, before the first test uses them."""
+    from app.services.sentiment import sentiment_analyzer
+    from app.services.semantic_search import semantic_search_service
+    
+    try:
+        sentiment_analyzer.analyze("warmup")
+        semantic_search_service.encode("warmup")
+    except Exception as e:
+        # Tests that need the models will report the failure themselves
+        print(f"Model warmup skipped: {e}")
+
+
+@pytest.fixture(scope="session")
+def analyzer():
+    """Shared sentiment analyzer (model loaded once per session)."""
+    from app.services.sentiment import sentiment_analyzer
+    return sentiment_analyzer
+
+
+@pytest.fixture(scope="session")
 async def async_client() -> AsyncGenerator[AsyncClient, None]:
-    """Create async HTTP client for API testing."""
+    """Create one async HTTP client, shared by all API tests."""
     from app.main import app
     
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
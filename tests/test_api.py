@@ -2,6 +2,10 @@
 Integration tests for FastAPI REST API endpoints.
 """
 
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from httpx import AsyncClient
 
@@ -22,6 +26,40 @@ class TestHealthEndpoint:
         assert "version" in data
 
 
+class TestCORS:
+    """Tests for CORS preflight handling."""
+    
+    @pytest.mark.asyncio
+    async def test_preflight_allowed_origin(self, async_client: AsyncClient):
+        """Test configured origins get a cacheable preflight response."""
+        response = await async_client.options(
+            "/api/v1/search",
+            headers={
+                "Origin": "http://localhost:3000",
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "Content-Type"
+            }
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+        assert response.headers["access-control-max-age"] == "86400"
+    
+    @pytest.mark.asyncio
+    async def test_preflight_unknown_origin(self, async_client: AsyncClient):
+        """Test origins outside CORS_ORIGINS are rejected."""
+        response = await async_client.options(
+            "/api/v1/search",
+            headers={
+                "Origin": "http://evil.example",
+                "Access-Control-Request-Method": "POST"
+            }
+        )
+        
+        assert response.status_code == 400
+        assert "access-control-allow-origin" not in response.headers
+
+
 class TestRootEndpoint:
     """Tests for root endpoint."""
     
@@ -100,3 +138,25 @@ class TestOpenAPIDocumentation:
         response = await async_client.get("/redoc")
         
         assert response.status_code == 200
+
+
+class TestUiServer:
+    """Tests for the lightweight UI server."""
+    
+    def test_import_does_not_load_ml_stack(self):
+        """Test that importing ui_server (as its uvicorn workers do) pulls in no ML modules."""
+        heavy = ("torch", "transformers", "sentence_transformers",
+                 "app.services.sentiment", "app.services.semantic_search")
+        script = (
+            "import sys, ui_server; "
+            f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        
+        assert result.stdout.strip() == ""
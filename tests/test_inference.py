@@ -0,0 +1,152 @@
+"""
+Unit tests for inference micro-batching.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import inference
+from app.services.inference import MicroBatcher
+
+
+@pytest.fixture
+async def make_batcher():
+    """Build batchers around a stub batch function; stops their workers afterwards."""
+    batchers = []
+
+    def factory(batch_fn, max_batch=8, max_wait_ms=20):
+        batcher = MicroBatcher(batch_fn, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        batchers.append(batcher)
+        return batcher
+
+    yield factory
+
+    for batcher in batchers:
+        if batcher._worker:
+            batcher._worker.cancel()
+
+
+class TestMicroBatcher:
+    """Tests for the MicroBatcher dispatch logic."""
+
+    async def test_coalesces_concurrent_submits(self, make_batcher):
+        """Test that submits arriving within max_wait share one batch."""
+        calls = []
+
+        def batch_fn(texts):
+            calls.append(list(texts))
+            return [len(text) for text in texts]
+
+        batcher = make_batcher(batch_fn, max_batch=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(t) for t in ["a", "bb", "ccc"]))
+
+        assert results == [1, 2, 3]
+        assert len(calls) == 1
+
+    async def test_dispatches_when_batch_is_full(self, make_batcher):
+        """Test that a full batch is dispatched without waiting for max_wait."""
+        calls = []
+
+        def batch_fn(texts):
+            calls.append(list(texts))
+            return texts
+
+        batcher = make_batcher(batch_fn, max_batch=2, max_wait_ms=10_000)
+        texts = ["one", "two", "six", "ten"]
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(t) for t in texts)), timeout=2
+        )
+
+        assert results == texts
+        assert [len(batch) for batch in calls] == [2, 2]
+
+    async def test_dispatches_partial_batch_after_max_wait(self, make_batcher):
+        """Test that a lone submit is dispatched once max_wait elapses."""
+        batcher = make_batcher(lambda texts: [t.upper() for t in texts], max_batch=8, max_wait_ms=20)
+
+        result = await asyncio.wait_for(batcher.submit("vpn down"), timeout=2)
+
+        assert result == "VPN DOWN"
+
+    async def test_results_follow_inputs_after_length_sort(self, make_batcher):
+        """Test that each caller gets its own result although the batch is sorted."""
+        calls = []
+
+        def batch_fn(texts):
+            calls.append(list(texts))
+            return [text.upper() for text in texts]
+
+        batcher = make_batcher(batch_fn, max_batch=8, max_wait_ms=50)
+        texts = ["a much longer ticket text", "short", "medium text"]
+        results = await asyncio.gather(*(batcher.submit(t) for t in texts))
+
+        assert results == [text.upper() for text in texts]
+        assert calls == [sorted(texts, key=len)]
+
+    async def test_batch_error_reaches_every_waiter(self, make_batcher):
+        """Test that a batch function exception is raised to all callers in the batch."""
+        def batch_fn(texts):
+            raise RuntimeError("model failed")
+
+        batcher = make_batcher(batch_fn, max_batch=8, max_wait_ms=50)
+        results = await asyncio.gather(
+            *(batcher.submit(t) for t in ["a", "b", "c"]), return_exceptions=True
+        )
+
+        assert len(results) == 3
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_keeps_serving_after_batch_error(self, make_batcher):
+        """Test that the worker survives a failed batch."""
+        calls = []
+
+        def batch_fn(texts):
+            calls.append(texts)
+            if len(calls) == 1:
+                raise RuntimeError("model failed")
+            return texts
+
+        batcher = make_batcher(batch_fn, max_batch=8, max_wait_ms=10)
+
+        with pytest.raises(RuntimeError):
+            await batcher.submit("first")
+        assert await batcher.submit("second") == "second"
+
+    async def test_zero_max_wait_is_kept(self, make_batcher):
+        """Test that an explicit max_wait_ms of 0 is not replaced by the default."""
+        batcher = make_batcher(lambda texts: texts, max_batch=8, max_wait_ms=0)
+
+        assert batcher.max_wait == 0
+        assert await batcher.submit("now") == "now"
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    async def test_batches_in_flight_bounded_by_workers(self, make_batcher, monkeypatch, workers):
+        """Test that up to one batch per inference worker runs at a time."""
+        executor = ThreadPoolExecutor(max_workers=workers)
+        monkeypatch.setattr(inference, "inference_executor", executor)
+        monkeypatch.setattr(inference, "INFERENCE_WORKERS", workers)
+
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def batch_fn(texts):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return texts
+
+        batcher = make_batcher(batch_fn, max_batch=1, max_wait_ms=0)
+        texts = [f"ticket {i}" for i in range(4)]
+        results = await asyncio.gather(*(batcher.submit(t) for t in texts))
+        executor.shutdown()
+
+        assert results == texts
+        assert peak[0] == workers
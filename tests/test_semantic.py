@@ -72,3 +72,110 @@ class TestSemanticSearch:
         similarity = semantic_search_service.similarity(emb1, emb2)
         
         assert similarity < 0.5  # Should be less similar
+
+
+class TestSemanticCache:
+    """Tests for the embedding-keyed search cache."""
+    
+    def test_hit_on_similar_embedding(self):
+        """Test that a near-identical query embedding hits the cache."""
+        from app.services.semantic_cache import SemanticCache
+        
+        cache = SemanticCache(threshold=0.95)
+        embedding = np.random.rand(384)
+        cache.store(embedding, {"results": []}, namespace="search")
+        
+        assert cache.lookup(embedding * 2, namespace="search") == {"results": []}
+        assert cache.stats()["hits"] == 1
+    
+    def test_miss_on_other_namespace(self):
+        """Test that entries are isolated per namespace."""
+        from app.services.semantic_cache import SemanticCache
+        
+        cache = SemanticCache(threshold=0.95)
+        embedding = np.random.rand(384)
+        cache.store(embedding, {"results": []}, namespace=("tiered", "L1"))
+        
+        assert cache.lookup(embedding, namespace=("tiered", "L2")) is None
+        assert cache.stats()["misses"] == 1
+    
+    def test_miss_on_dissimilar_embedding(self):
+        """Test that orthogonal embeddings do not hit."""
+        from app.services.semantic_cache import SemanticCache
+        
+        cache = SemanticCache(threshold=0.95)
+        first = np.zeros(384)
+        first[0] = 1.0
+        second = np.zeros(384)
+        second[1] = 1.0
+        cache.store(first, "payload")
+        
+        assert cache.lookup(second) is None
+    
+    def test_oldest_entry_evicted_when_full(self):
+        """Test that a full namespace overwrites its oldest entry."""
+        from app.services.semantic_cache import SemanticCache
+        
+        cache = SemanticCache(threshold=0.99, max_entries=20)
+        embeddings = np.eye(384)[:21]
+        for index, embedding in enumerate(embeddings):
+            cache.store(embedding, index)
+        
+        assert cache.lookup(embeddings[0]) is None
+        assert cache.lookup(embeddings[1]) == 1
+        assert cache.lookup(embeddings[20]) == 20
+        assert cache.stats()["entries"] == 20
+
+
+class TestHybridSearchCandidates:
+    """Tests for how hybrid search picks its nearest-neighbour candidates."""
+    
+    class _RecordingSession:
+        """Session stub that records query parameters and returns no rows."""
+        
+        def __init__(self):
+            self.params = None
+        
+        async def execute(self, statement, params=None):
+            self.params = params
+            
+            class _Result:
+                def fetchall(self):
+                    return []
+            
+            return _Result()
+    
+    async def test_each_tier_gets_its_own_candidates(self, monkeypatch):
+        """Test that a tier far from the query still gets candidates when another tier dominates."""
+        import time
+        from app.models.ticket import KnowledgeTier
+        from app.services import semantic_search, vector_index
+        
+        # Five L2 entries right at the query, one L1 entry far from it
+        query = np.zeros(384, dtype=np.float32)
+        query[0] = 1.0
+        near = np.tile(query, (5, 1))
+        far = np.zeros((1, 384), dtype=np.float32)
+        far[0, 1] = 1.0
+        
+        index = vector_index.KnowledgeVectorIndex(ttl_seconds=60)
+        index._matrix = np.vstack([near, far])
+        index._ids = np.array([1, 2, 3, 4, 5, 99], dtype=np.int64)
+        index._tiers = np.array(["L2"] * 5 + ["L1"], dtype=object)
+        index._built_at = time.monotonic()
+        
+        monkeypatch.setattr(vector_index, "kb_vector_index", index)
+        monkeypatch.setattr(semantic_search.settings, "kb_memory_index", True)
+        monkeypatch.setattr(semantic_search.settings, "ann_candidates", 3)
+        
+        session = self._RecordingSession()
+        await semantic_search.semantic_search_service.hybrid_search(
+            session=session,
+            query="vpn",
+            tier=[KnowledgeTier.L1, KnowledgeTier.L2],
+            top_k=3,
+            query_embedding=query
+        )
+        
+        assert 99 in session.params["sem_ids"]
+        assert len(session.params["sem_ids"]) == 4
@@ -5,6 +5,18 @@ Unit tests for BERT Sentiment Analysis and Urgency Scoring.
 import pytest
 
 
+NEGATIVE_TEXT = "This is terrible! Nothing works and I'm extremely frustrated!"
+POSITIVE_TEXT = "Thank you so much! This works perfectly and I'm very happy!"
+NEUTRAL_TEXT = "I need to reset my password for the portal."
+
+
+@pytest.fixture(scope="session")
+def sentiment_results(analyzer):
+    """Analyze all single-text cases in one batched forward pass."""
+    texts = [NEGATIVE_TEXT, POSITIVE_TEXT, NEUTRAL_TEXT]
+    return dict(zip(texts, analyzer.analyze_batch(texts)))
+
+
 class TestSentimentAnalysis:
     """Tests for BERT sentiment analyzer."""
     
@@ -17,65 +29,78 @@ class TestSentimentAnalysis:
         
         assert analyzer1 is analyzer2
     
-    def test_analyze_negative_text(self):
+    def test_analyze_negative_text(self, sentiment_results):
         """Test sentiment analysis on negative text."""
-        from app.services.sentiment import sentiment_analyzer
-        
-        result = sentiment_analyzer.analyze(
-            "This is terrible! Nothing works and I'm extremely frustrated!"
-        )
+        result = sentiment_results[NEGATIVE_TEXT]
         
         assert result["label"] in ["negative", "very_negative"]
         assert result["score"] < 0
         assert 0 <= result["confidence"] <= 1
     
-    def test_analyze_positive_text(self):
+    def test_analyze_positive_text(self, sentiment_results):
         """Test sentiment analysis on positive text."""
-        from app.services.sentiment import sentiment_analyzer
-        
-        result = sentiment_analyzer.analyze(
-            "Thank you so much! This works perfectly and I'm very happy!"
-        )
+        result = sentiment_results[POSITIVE_TEXT]
         
         assert result["label"] in ["positive", "very_positive"]
         assert result["score"] > 0
     
-    def test_analyze_neutral_text(self):
+    def test_analyze_neutral_text(self, sentiment_results):
         """Test sentiment analysis on neutral text."""
-        from app.services.sentiment import sentiment_analyzer
-        
-        result = sentiment_analyzer.analyze(
-            "I need to reset my password for the portal."
-        )
+        result = sentiment_results[NEUTRAL_TEXT]
         
         # Should be relatively neutral
         assert -0.5 <= result["score"] <= 0.5
     
-    def test_analyze_empty_text(self):
+    def test_analyze_empty_text(self, analyzer):
         """Test handling of empty text."""
-        from app.services.sentiment import sentiment_analyzer
-        
-        result = sentiment_analyzer.analyze("")
+        result = analyzer.analyze("")
         
         assert result["label"] == "neutral"
         assert result["score"] == 0.0
         assert result["confidence"] == 0.0
     
-    def test_batch_analysis(self):
+    def test_batch_analysis(self, analyzer):
         """Test batch sentiment analysis."""
-        from app.services.sentiment import sentiment_analyzer
-        
         texts = [
             "This is great!",
             "This is terrible!",
             "This is okay."
         ]
         
-        results = sentiment_analyzer.analyze_batch(texts)
+        results = analyzer.analyze_batch(texts)
         
         assert len(results) == 3
         assert results[0]["score"] > results[2]["score"]  # Great > Okay
         assert results[2]["score"] > results[1]["score"]  # Okay > Terrible
+    
+    def test_sentiment_category_boundaries(self, analyzer):
+        """Test category bins are inclusive on their upper bound."""
+        scores = [-1.0, -0.75, -0.5, -0.25, 0.0, 0.25, 0.5, 0.75, 1.0]
+        expected = [
+            "very_negative", "very_negative", "negative", "negative",
+            "neutral", "neutral", "positive", "positive", "very_positive"
+        ]
+        
+        assert [analyzer.get_sentiment_category(s) for s in scores] == expected
+        assert list(analyzer.get_sentiment_category_array(scores)) == expected
+    
+    def test_classify_runs_one_analysis(self, analyzer, monkeypatch):
+        """Test that is_negative and is_positive share one memoized analysis."""
+        from app.services.sentiment import SentimentLabel
+        
+        calls = []
+        
+        def fake_analyze(text):
+            calls.append(text)
+            return {"label": "negative", "score": -0.5, "confidence": 0.9, "raw_label": "2 stars"}
+        
+        monkeypatch.setattr(analyzer, "analyze", fake_analyze)
+        text = "classify memo test: printer on floor 3 jams again"
+        
+        assert analyzer.is_negative(text)
+        assert not analyzer.is_positive(text)
+        assert analyzer.classify(text) is SentimentLabel.NEGATIVE
+        assert calls == [text]
 
 
 class TestUrgencyCalculation:
@@ -98,7 +123,7 @@ class TestUrgencyCalculation:
         
         assert result.score >= 8
         assert result.level.value == "critical"
-        assert "payment" in result.explanation.lower() or result.factors["keywords"] > 0
+        assert "payment" in result.explanation.lower() or result.factors.keywords > 0
     
     def test_security_issue_urgency(self):
         """Test that security issues get high urgency."""
@@ -167,4 +192,19 @@ class TestUrgencyCalculation:
         )
         
         # Check that it detected a category or has factors
-        assert "category" in result.factors or result.factors.get("category", 0) >= 0
+        assert result.factors.category >= 0
+    
+    def test_reported_keyword_follows_configured_order(self):
+        """Test that with several critical keywords, the first configured one is reported."""
+        from app.config import get_settings
+        from app.services.urgency import urgency_calculator
+        
+        neutral = {"label": "neutral", "score": 0.0, "confidence": 1.0, "raw_label": "3 stars"}
+        text = " ".join(reversed(get_settings().critical_keywords_list))
+        
+        result = urgency_calculator.calculate(
+            "Incident report", text, sentiment_result=neutral
+        )
+        
+        assert result.keywords == (get_settings().critical_keywords_list[0],)
+        assert f"Critical keywords detected: {result.keywords[0]}" in result.explanation
@@ -0,0 +1,107 @@
+"""
+Unit tests for the in-memory knowledge base vector index.
+"""
+
+import time
+import pytest
+import numpy as np
+
+from app.models.ticket import KnowledgeTier, TIER_VALUES
+from app.services.vector_index import KnowledgeVectorIndex
+
+
+def _unit(*weights: float) -> np.ndarray:
+    """384-dimensional vector with the given leading components, normalized."""
+    vector = np.zeros(384, dtype=np.float32)
+    vector[:len(weights)] = weights
+    return vector / np.linalg.norm(vector)
+
+
+# (id, tier, embedding); entry i points along axis i
+ENTRIES = [
+    (10, KnowledgeTier.L1, _unit(1, 0, 0, 0)),
+    (11, KnowledgeTier.L1, _unit(0, 1, 0, 0)),
+    (12, KnowledgeTier.L2, _unit(0, 0, 1, 0)),
+    (13, KnowledgeTier.L3, _unit(0, 0, 0, 1)),
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """Index whose refresh loads ENTRIES instead of querying the database."""
+    index = KnowledgeVectorIndex(ttl_seconds=60)
+    index.refresh_calls = 0
+
+    async def fake_refresh(session):
+        index.refresh_calls += 1
+        index._matrix = np.stack([embedding for _, _, embedding in ENTRIES])
+        index._ids = np.array([entry_id for entry_id, _, _ in ENTRIES], dtype=np.int64)
+        index._tiers = np.array([TIER_VALUES[tier] for _, tier, _ in ENTRIES], dtype=object)
+        index._built_at = time.monotonic()
+
+    monkeypatch.setattr(index, "refresh", fake_refresh)
+    return index
+
+
+class TestKnowledgeVectorIndex:
+    """Tests for nearest-neighbour lookup and rebuild behaviour."""
+
+    async def test_returns_top_k_ids(self, index):
+        """Test that the k most similar entries are returned."""
+        query = _unit(0.1, 0.9, 0.5, 0)
+
+        ids = await index.nearest(None, query, k=2)
+
+        assert sorted(ids) == [11, 12]
+
+    async def test_k_larger_than_index_returns_all(self, index):
+        """Test that asking for more ids than entries returns every entry."""
+        ids = await index.nearest(None, _unit(1, 0, 0, 0), k=10)
+
+        assert sorted(ids) == [10, 11, 12, 13]
+
+    async def test_tier_filter(self, index):
+        """Test that only entries in the requested tiers are considered."""
+        query = _unit(0.2, 0.1, 1, 1)
+
+        assert await index.nearest(None, query, k=1, tiers=[KnowledgeTier.L1]) == [10]
+        assert sorted(await index.nearest(
+            None, query, k=2, tiers=[KnowledgeTier.L2, KnowledgeTier.L3]
+        )) == [12, 13]
+
+    async def test_tier_filter_without_matches(self, index):
+        """Test that a tier with no entries yields no ids."""
+        await index.nearest(None, _unit(1), k=1)
+        index._tiers = np.array(["L1"] * len(ENTRIES), dtype=object)
+
+        assert await index.nearest(None, _unit(1), k=3, tiers=[KnowledgeTier.L3]) == []
+
+    async def test_empty_index(self):
+        """Test that an empty index returns no ids."""
+        index = KnowledgeVectorIndex(ttl_seconds=60)
+        index._built_at = time.monotonic()
+
+        assert await index.nearest(None, _unit(1), k=5) == []
+
+    async def test_builds_once_while_fresh(self, index):
+        """Test that the matrix is built on first use and then reused."""
+        await index.nearest(None, _unit(1), k=1)
+        await index.nearest(None, _unit(1), k=1)
+
+        assert index.refresh_calls == 1
+
+    async def test_invalidate_forces_rebuild(self, index):
+        """Test that invalidate() triggers a rebuild on the next lookup."""
+        await index.nearest(None, _unit(1), k=1)
+        index.invalidate()
+        await index.nearest(None, _unit(1), k=1)
+
+        assert index.refresh_calls == 2
+
+    async def test_expired_ttl_forces_rebuild(self, index):
+        """Test that a matrix older than the TTL is rebuilt."""
+        await index.nearest(None, _unit(1), k=1)
+        index._built_at -= index.ttl_seconds + 1
+        await index.nearest(None, _unit(1), k=1)
+
+        assert index.refresh_calls == 2
@@ -2,122 +2,219 @@
 Simple static file server for the SupportIQ UI.
 Use this for quick UI testing without waiting for ML models to load.
 """
+import gzip
+import os
+import sys
+import orjson
 from pathlib import Path
+from typing import Dict, Tuple
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
 import uvicorn
 
+from app.config import get_settings
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent
 STATIC_DIR = PROJECT_ROOT / "static"
 
+# Text assets worth gzipping
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".css"}
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that gzips text assets once and lets browsers revalidate.
+
+    Compressed bodies are kept in memory keyed by file mtime, so edits are
+    picked up without a restart. Responses carry Cache-Control: no-cache,
+    so browsers keep their copy and get a 304 while the ETag still matches
+    (the asset names are not content-hashed, so long max-age is unsafe).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._gzipped: Dict[str, Tuple[float, bytes]] = {}
+
+    def _gzip_body(self, full_path: str, mtime: float) -> bytes:
+        """Get the gzipped file contents, compressing only when the file changed."""
+        cached = self._gzipped.get(full_path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, gzip.compress(Path(full_path).read_bytes(), compresslevel=9, mtime=0))
+            self._gzipped[full_path] = cached
+        return cached[1]
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["Cache-Control"] = "no-cache"
+
+        compressible = os.path.splitext(full_path)[1] in COMPRESSIBLE_SUFFIXES
+        use_gzip = compressible and "gzip" in request_headers.get("accept-encoding", "")
+        if compressible:
+            response.headers["Vary"] = "Accept-Encoding"
+        if use_gzip:
+            # Distinct validator for the compressed representation
+            response.headers["ETag"] = response.headers["ETag"][:-1] + '-gzip"'
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        if not use_gzip:
+            return response
+
+        headers = {
+            name: response.headers[name]
+            for name in ("ETag", "Last-Modified", "Cache-Control", "Vary")
+        }
+        headers["Content-Encoding"] = "gzip"
+        return Response(
+            self._gzip_body(str(full_path), stat_result.st_mtime),
+            status_code=status_code,
+            headers=headers,
+            media_type=response.media_type
+        )
+
+
+_index_cache: Tuple[float, bytes] = (0.0, b"")
+
+
+def _index_html(index_path: Path) -> bytes:
+    """Get index.html contents, re-reading the file only after it changes."""
+    global _index_cache
+    mtime = index_path.stat().st_mtime
+    if _index_cache[0] != mtime:
+        _index_cache = (mtime, index_path.read_bytes())
+    return _index_cache[1]
+
 app = FastAPI(title="SupportIQ UI Server")
 
-# CORS
+# CORS, matching the main app: only the configured UI origins, and the
+# middleware passes requests without an Origin header straight through
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=get_settings().cors_origins_list,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
 # Mount static files
 if STATIC_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    app.mount("/static", CachedStaticFiles(directory=str(STATIC_DIR)), name="static")
 
 @app.get("/")
 async def root():
     """Serve the Query Resolution UI."""
     index_path = STATIC_DIR / "index.html"
     if index_path.exists():
-        return FileResponse(str(index_path))
+        return Response(_index_html(index_path), media_type="text/html")
     return {"error": "index.html not found", "static_dir": str(STATIC_DIR)}
 
-# Mock API endpoints for UI testing
-@app.post("/api/v1/tickets")
-async def mock_create_ticket(data: dict = None):
-    """Mock ticket creation for UI testing."""
-    return {
-        "ticket": {
-            "id": 42,
-            "title": "Test Ticket",
-            "description": "Test description",
-            "status": "open",
-            "urgency_score": 7,
-            "urgency_level": "high",
-            "sentiment_score": -0.6,
-            "sentiment_label": "negative",
-            "category": "email",
-            "assigned_tier": "L2",
-            "user_email": "test@example.com",
-            "created_at": "2026-02-01T23:00:00Z",
-            "updated_at": None,
-            "resolved_at": None
+# Mock API endpoints for UI testing. The response never changes, so it is
+# serialized once here and each request just sends the bytes.
+MOCK_TICKET_RESPONSE = orjson.dumps({
+    "ticket": {
+        "id": 42,
+        "title": "Test Ticket",
+        "description": "Test description",
+        "status": "open",
+        "urgency_score": 7,
+        "urgency_level": "high",
+        "sentiment_score": -0.6,
+        "sentiment_label": "negative",
+        "category": "email",
+        "assigned_tier": "L2",
+        "user_email": "test@example.com",
+        "created_at": "2026-02-01T23:00:00Z",
+        "updated_at": None,
+        "resolved_at": None
+    },
+    "urgency_analysis": {
+        "score": 7,
+        "level": "high",
+        "assigned_tier": "L2",
+        "factors": {
+            "sentiment_weight": 0.3,
+            "keyword_weight": 0.4,
+            "category_weight": 0.3
         },
-        "urgency_analysis": {
-            "score": 7,
-            "level": "high",
-            "assigned_tier": "L2",
-            "factors": {
-                "sentiment_weight": 0.3,
-                "keyword_weight": 0.4,
-                "category_weight": 0.3
-            },
-            "explanation": "High urgency due to email access issues affecting work productivity."
+        "explanation": "High urgency due to email access issues affecting work productivity."
+    },
+    "sentiment_analysis": {
+        "label": "negative",
+        "score": -0.6,
+        "confidence": 0.89
+    },
+    "suggested_solutions": [
+        {
+            "id": 1,
+            "tier": "L1",
+            "title": "Restart Outlook and Reconnect to Server",
+            "content": "1. Close Outlook completely\n2. Press Windows + R, type 'outlook.exe /resetnavpane' and press Enter\n3. Wait for Outlook to restart\n4. If the issue persists, go to File > Account Settings and click 'Repair'",
+            "keywords": ["outlook", "email", "sync", "restart"],
+            "category": "email",
+            "usage_count": 156,
+            "avg_feedback_score": 4.5,
+            "semantic_score": 0.92,
+            "keyword_score": 0.85,
+            "hybrid_score": 0.89
         },
-        "sentiment_analysis": {
-            "label": "negative",
-            "score": -0.6,
-            "confidence": 0.89
+        {
+            "id": 2,
+            "tier": "L2",
+            "title": "Reset Outlook Profile Configuration",
+            "content": "1. Go to Control Panel > Mail > Show Profiles\n2. Click 'Remove' to delete the corrupted profile\n3. Click 'Add' to create a new profile\n4. Enter your email account credentials\n5. Set the new profile as default",
+            "keywords": ["outlook", "profile", "email", "configuration"],
+            "category": "email",
+            "usage_count": 89,
+            "avg_feedback_score": 4.2,
+            "semantic_score": 0.85,
+            "keyword_score": 0.78,
+            "hybrid_score": 0.82
         },
-        "suggested_solutions": [
-            {
-                "id": 1,
-                "tier": "L1",
-                "title": "Restart Outlook and Reconnect to Server",
-                "content": "1. Close Outlook completely\n2. Press Windows + R, type 'outlook.exe /resetnavpane' and press Enter\n3. Wait for Outlook to restart\n4. If the issue persists, go to File > Account Settings and click 'Repair'",
-                "keywords": ["outlook", "email", "sync", "restart"],
-                "category": "email",
-                "usage_count": 156,
-                "avg_feedback_score": 4.5,
-                "semantic_score": 0.92,
-                "keyword_score": 0.85,
-                "hybrid_score": 0.89
-            },
-            {
-                "id": 2,
-                "tier": "L2",
-                "title": "Reset Outlook Profile Configuration",
-                "content": "1. Go to Control Panel > Mail > Show Profiles\n2. Click 'Remove' to delete the corrupted profile\n3. Click 'Add' to create a new profile\n4. Enter your email account credentials\n5. Set the new profile as default",
-                "keywords": ["outlook", "profile", "email", "configuration"],
-                "category": "email",
-                "usage_count": 89,
-                "avg_feedback_score": 4.2,
-                "semantic_score": 0.85,
-                "keyword_score": 0.78,
-                "hybrid_score": 0.82
-            },
-            {
-                "id": 3,
-                "tier": "L1",
-                "title": "Clear Outlook Cache Files",
-                "content": "1. Close Outlook\n2. Navigate to %localappdata%\\Microsoft\\Outlook\n3. Delete all .ost files (these will regenerate)\n4. Restart Outlook and allow it to resync\n5. This may take several minutes for large mailboxes",
-                "keywords": ["outlook", "cache", "ost", "sync"],
-                "category": "email",
-                "usage_count": 234,
-                "avg_feedback_score": 4.7,
-                "semantic_score": 0.78,
-                "keyword_score": 0.82,
-                "hybrid_score": 0.80
-            }
-        ],
-        "message": "Ticket created successfully with AI analysis"
-    }
+        {
+            "id": 3,
+            "tier": "L1",
+            "title": "Clear Outlook Cache Files",
+            "content": "1. Close Outlook\n2. Navigate to %localappdata%\\Microsoft\\Outlook\n3. Delete all .ost files (these will regenerate)\n4. Restart Outlook and allow it to resync\n5. This may take several minutes for large mailboxes",
+            "keywords": ["outlook", "cache", "ost", "sync"],
+            "category": "email",
+            "usage_count": 234,
+            "avg_feedback_score": 4.7,
+            "semantic_score": 0.78,
+            "keyword_score": 0.82,
+            "hybrid_score": 0.80
+        }
+    ],
+    "message": "Ticket created successfully with AI analysis"
+})
+
+
+@app.post("/api/v1/tickets")
+async def mock_create_ticket():
+    """Mock ticket creation for UI testing."""
+    return Response(MOCK_TICKET_RESPONSE, media_type="application/json")
 
 if __name__ == "__main__":
+    # Lightweight mode: nothing above may pull in the ML stack
+    if "torch" in sys.modules:
+        raise RuntimeError("ui_server must not import the ML services")
+    
     print("🚀 Starting SupportIQ UI Server (lightweight mode)")
     print(f"📁 Static files: {STATIC_DIR}")
-    uvicorn.run(app, host="0.0.0.0", port=3000)
+    # "auto" picks uvloop and httptools (installed with uvicorn[standard])
+    # and falls back to asyncio/h11 where they're unavailable
+    uvicorn.run(
+        "ui_server:app",
+        host="0.0.0.0",
+        port=3000,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        access_log=False
+    )